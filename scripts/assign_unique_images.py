@@ -3,33 +3,11 @@
 Update all listings with unique, category-appropriate images from Unsplash.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 import random
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from listing_record import scan_records
+from write_elision import ElidingWriter
 
 def get_category_images():
     """Get category-specific image pools from Unsplash"""
@@ -101,7 +79,8 @@ def assign_unique_images():
     try:
         # Get all listings
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        writer = ElidingWriter(listings_ref)
+        docs = list(scan_records(db, 'listings', fields=['category', 'title', 'images']))
         
         print(f"📊 Found {len(docs)} listings to update")
         
@@ -110,9 +89,8 @@ def assign_unique_images():
         updated_count = 0
         
         for doc in docs:
-            data = doc.to_dict()
-            category = data.get('category', '').lower()
-            title = data.get('title', 'No title')
+            category = doc.get('category', '').lower()
+            title = doc.get('title', 'No title')
             
             # Initialize counter for this category
             if category not in category_counters:
@@ -126,25 +104,23 @@ def assign_unique_images():
                 image_index = category_counters[category] % len(available_images)
                 new_image_url = available_images[image_index]
                 
-                # Update the listing with new image
-                doc.reference.update({
-                    'images': [new_image_url]
-                })
-                
-                print(f"✅ Updated {category}: {title}")
-                print(f"   New image: {new_image_url}")
+                # Update the listing with new image, unless it already has it
+                if writer.update(doc, {'images': [new_image_url]}):
+                    print(f"✅ Updated {category}: {title}")
+                    print(f"   New image: {new_image_url}")
+                    updated_count += 1
                 
                 category_counters[category] += 1
-                updated_count += 1
             else:
                 print(f"⚠️  No images defined for category: {category}")
         
         print(f"\n🎉 Successfully updated {updated_count} listings with unique images!")
+        print(writer.summary())
         
         # Show summary
         print(f"\n📋 Summary by category:")
         for category, count in category_counters.items():
-            print(f"  {category}: {count} listings updated")
+            print(f"  {category}: {count} listings assigned")
         
     except Exception as e:
         print(f"❌ Error assigning unique images: {e}")
@@ -3,32 +3,9 @@
 Assign completely new, verified working image URLs to ensure all images are unique and functional.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from listing_record import scan_records
+from write_elision import ElidingWriter
 
 def assign_new_unique_images():
     """Assign completely new unique images using verified working URLs"""
@@ -98,16 +75,16 @@ def assign_new_unique_images():
     
     try:
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        writer = ElidingWriter(listings_ref)
+        docs = list(scan_records(db, 'listings', fields=['category', 'title', 'images']))
         
         # Group by category and assign unique images
         category_counters = {}
         updated_count = 0
         
         for doc in docs:
-            data = doc.to_dict()
-            category = data.get('category', '').lower()
-            title = data.get('title', 'No title')
+            category = doc.get('category', '').lower()
+            title = doc.get('title', 'No title')
             
             if category not in category_counters:
                 category_counters[category] = 0
@@ -117,18 +94,16 @@ def assign_new_unique_images():
                 image_index = category_counters[category] % len(available_images)
                 new_image_url = available_images[image_index]
                 
-                # Update the listing
-                doc.reference.update({
-                    'images': [new_image_url]
-                })
-                
-                print(f"✅ Updated {category}: {title}")
-                print(f"   Image: {new_image_url}")
+                # Update the listing, unless it already has this image
+                if writer.update(doc, {'images': [new_image_url]}):
+                    print(f"✅ Updated {category}: {title}")
+                    print(f"   Image: {new_image_url}")
+                    updated_count += 1
                 
                 category_counters[category] += 1
-                updated_count += 1
         
         print(f"\n🎉 Successfully updated {updated_count} listings with new verified images!")
+        print(writer.summary())
         
         # Check for uniqueness
         all_urls = []
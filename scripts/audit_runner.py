@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Single-pass listings health report.
+Each audit is a check object (see listing_checks.py) that declares the
+listing fields it reads and is fed every listing in turn; the runner scans
+the collection once with the union of those fields projected, so running
+every check costs one read of the collection instead of one per audit script.
+
+Usage:
+  python audit_runner.py                          # every check
+  python audit_runner.py --checks null-fields image-tokens
+  python audit_runner.py --offline --json report.json
+Requires: pip install firebase-admin
+"""
+
+import argparse
+import json
+
+from firestore_client import initialize_firebase
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments
+from listing_checks import (CategoryStatsCheck, DuplicateImagesCheck, ImageTokenCheck, NullFieldsCheck,
+                            OrphanUsersCheck)
+from listings_snapshot import add_snapshot_arguments, scan_source, snapshot_from_args
+from progress import DEFAULT_INTERVAL, ProgressReporter, add_progress_arguments
+
+# name -> factory given the Firestore client and the snapshot (either may be None)
+CHECKS = {
+    DuplicateImagesCheck.name: lambda db, snapshot: DuplicateImagesCheck(),
+    NullFieldsCheck.name: lambda db, snapshot: NullFieldsCheck(),
+    OrphanUsersCheck.name: lambda db, snapshot: OrphanUsersCheck(db, snapshot),
+    CategoryStatsCheck.name: lambda db, snapshot: CategoryStatsCheck(),
+    ImageTokenCheck.name: lambda db, snapshot: ImageTokenCheck(),
+}
+
+
+def run_audit(db, checks, page_size=DEFAULT_PAGE_SIZE, snapshot=None, progress=None):
+    """
+    Feed every listing to each check in a single scan projected on the union
+    of the checks' fields. Returns {check name: result}.
+    """
+    fields = sorted({field for check in checks for field in check.fields})
+    for doc in scan_source(db, 'listings', fields=fields, page_size=page_size, snapshot=snapshot):
+        data = doc.to_dict()
+        for check in checks:
+            check.add(doc.id, data)
+        if progress is not None:
+            progress.update()
+    return {check.name: check.finish() for check in checks}
+
+
+def audit_listings(check_names=None, page_size=DEFAULT_PAGE_SIZE, snapshot=None, json_path=None,
+                   quiet=False, progress_interval=DEFAULT_INTERVAL):
+    """Run the named checks (default: all) over listings, print their reports and return the results"""
+    db = None
+    if snapshot is None:
+        db = initialize_firebase()
+        if not db:
+            return
+
+    checks = [CHECKS[name](db, snapshot) for name in check_names or CHECKS]
+    progress = ProgressReporter("Auditing listings", unit='listings', interval=progress_interval, quiet=quiet)
+    progress.log(f"🩺 Running {len(checks)} checks in one pass: {', '.join(check.name for check in checks)}")
+
+    results = run_audit(db, checks, page_size=page_size, snapshot=snapshot, progress=progress)
+
+    if not quiet:
+        for check in checks:
+            print(f"\n📋 {check.name}")
+            check.print_report(results[check.name])
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        progress.log(f"\n📄 Report written to {json_path}")
+    progress.finish(checks=[check.name for check in checks])
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several listing audits in a single collection scan")
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), help="checks to run (default: all)")
+    parser.add_argument('--json', metavar='PATH', help="also write the full results as JSON")
+    add_scan_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+    audit_listings(check_names=args.checks, page_size=args.page_size, snapshot=snapshot_from_args(args),
+                   json_path=args.json, quiet=args.quiet, progress_interval=args.progress_interval)
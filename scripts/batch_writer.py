@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Batched, pipelined Firestore writes for bulk admin operations.
+Groups write operations into batches of up to 500 and commits several
+batches concurrently, retrying contended batches with exponential backoff
+and reporting throughput when done.
+Requires: pip install firebase-admin
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+# Firestore rejects batches with more than 500 writes
+FIRESTORE_BATCH_LIMIT = 500
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.5  # seconds before the first retry, doubled on each attempt
+
+# Transient google.api_core errors worth retrying. Matched by class name so this
+# module does not have to import the Google client libraries.
+RETRYABLE_ERRORS = frozenset({
+    'Aborted', 'DeadlineExceeded', 'InternalServerError',
+    'ResourceExhausted', 'ServiceUnavailable', 'TooManyRequests',
+})
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items from any iterable without materializing it"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _commit_batch(db, operations):
+    """Build and commit a single write batch from (op, doc_ref, data) tuples"""
+    batch = db.batch()
+    for op, doc_ref, data in operations:
+        if op == 'set':
+            batch.set(doc_ref, data)
+        elif op == 'update':
+            batch.update(doc_ref, data)
+        elif op == 'delete':
+            batch.delete(doc_ref)
+        else:
+            raise ValueError(f"Unknown batch operation: {op}")
+    batch.commit()
+    return len(operations)
+
+
+def is_retryable(error):
+    """True for contention and availability errors that may succeed on retry"""
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def _commit_with_retry(db, operations, max_retries, backoff):
+    """
+    Commit one batch, retrying transient failures with jittered exponential
+    backoff. Batches are atomic, so a failed attempt wrote nothing and the
+    whole batch can be resent. Returns (written, retries).
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return _commit_batch(db, operations), attempt
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            time.sleep(random.uniform(0, backoff * 2 ** attempt))
+
+
+def commit_in_batches(db, operations, batch_size=FIRESTORE_BATCH_LIMIT, max_workers=8,
+                      on_batch=None, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF,
+                      on_commit=None):
+    """
+    Commit an iterable of ('set' | 'update' | 'delete', doc_ref, data) operations.
+
+    Operations are consumed lazily, so generators of any size can be passed in.
+    At most `max_workers` batches are in flight at once;
+    `on_batch(batch_size, written_so_far)` is called after each successful
+    commit, and `on_commit(batch_index)` with the zero-based position of that
+    batch in the stream, so callers can checkpoint progress. Batches failing
+    with a transient error are retried up to `max_retries` times.
+
+    Returns a stats dict with written/failed counts, batch and retry counts,
+    elapsed seconds and docs/sec.
+    """
+    batch_size = min(batch_size, FIRESTORE_BATCH_LIMIT)
+    stats = {'written': 0, 'failed': 0, 'batches': 0, 'retries': 0, 'errors': []}
+    start = time.perf_counter()
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            index, size = pending.pop(future)
+            try:
+                written, retries = future.result()
+                stats['written'] += written
+                stats['retries'] += retries
+                stats['batches'] += 1
+                if on_batch:
+                    on_batch(size, stats['written'])
+                if on_commit:
+                    on_commit(index)
+            except Exception as e:
+                stats['failed'] += size
+                stats['errors'].append(str(e))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, chunk in enumerate(chunked(operations, batch_size)):
+            # Keep a bounded number of batches in flight to cap memory use
+            if len(pending) >= max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = executor.submit(_commit_with_retry, db, chunk, max_retries, backoff)
+            pending[future] = (index, len(chunk))
+        if pending:
+            done, _ = wait(pending)
+            collect(done)
+
+    elapsed = time.perf_counter() - start
+    stats['elapsed'] = elapsed
+    stats['docs_per_sec'] = stats['written'] / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def print_write_stats(stats, label="documents"):
+    """Print a one-block summary of a commit_in_batches run"""
+    print(f"📊 Wrote {stats['written']} {label} in {stats['batches']} batches "
+          f"({stats['elapsed']:.2f}s, {stats['docs_per_sec']:.0f} docs/sec)")
+    if stats['retries']:
+        print(f"🔁 {stats['retries']} batch commits retried after transient errors")
+    if stats['failed']:
+        print(f"❌ {stats['failed']} {label} failed to write")
+        for error in stats['errors'][:5]:
+            print(f"   {error}")
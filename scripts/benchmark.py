@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin scripts against the local Firestore emulator.
+For each dataset size the emulator is wiped and filled with synthetic
+listings, then each tool runs in its own process while we record wall time,
+docs/sec, the Firestore RPCs, document reads and writes it issued and its
+peak RSS. Results are written to a JSON report and can be compared against a
+previous report to catch regressions before a script is run against production.
+
+Usage:
+  firebase emulators:start --only firestore
+  python benchmark.py --sizes 1000 10000 100000
+  python benchmark.py --compare .cache/benchmark-baseline.json
+Requires: pip install firebase-admin faker
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+from firestore_metrics import ENV_JSON
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIREBASE_JSON = os.path.join(SCRIPTS_DIR, '..', 'firebase.json')
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.2
+DATASET_SEED = 42
+
+# tool -> script, arguments (given the dataset size and a scratch directory),
+# and whether it runs against a seeded collection or an empty one
+BENCHMARKS = {
+    'seed_with_tokens': {
+        'script': 'seed_with_tokens.py',
+        'args': lambda size, scratch: ['--bulk', '--count', str(size), '--quiet'],
+        'seeded': False,
+    },
+    'fix_data_quality': {
+        'script': 'fix_data_quality.py',
+        'args': lambda size, scratch: ['--quiet'],
+        'seeded': True,
+    },
+    'cleanup_listings': {
+        'script': 'cleanup_listings.py',
+        'args': lambda size, scratch: ['--restart', '--checkpoint', os.path.join(scratch, 'cleanup.checkpoint.jsonl')],
+        'seeded': True,
+    },
+    'assign_perfect_images': {
+        'script': 'perfect_image_matching.py',
+        'args': lambda size, scratch: ['--url-cache-path', os.path.join(scratch, 'url_health.sqlite'),
+                                       '--url-cache-ttl', '1e9', '--quiet'],
+        'seeded': True,
+    },
+}
+
+
+def emulator_host_from_config():
+    """Emulator address configured in firebase.json"""
+    with open(FIREBASE_JSON) as f:
+        firestore = json.load(f).get('emulators', {}).get('firestore', {})
+    return f"{firestore.get('host', '127.0.0.1')}:{firestore.get('port', 8080)}"
+
+
+def emulator_reachable(host):
+    hostname, port = host.rsplit(':', 1)
+    try:
+        with socket.create_connection((hostname, int(port)), timeout=2):
+            return True
+    except OSError:
+        return False
+
+
+def reset_emulator(host, project):
+    """Delete every document in the emulator's default database"""
+    url = f"http://{host}/emulator/v1/projects/{project}/databases/(default)/documents"
+    urllib.request.urlopen(urllib.request.Request(url, method='DELETE')).close()
+
+
+def seed_dataset(db, size):
+    """Fill the listings collection with `size` reproducible synthetic listings"""
+    from batch_writer import commit_in_batches
+    from seed_realistic import generate_listings
+    from seed_with_tokens import SELLER_USER_IDS
+
+    listings_ref = db.collection('listings')
+    operations = (
+        ('set', listings_ref.document(f"bench{i:07d}"),
+         {**listing, 'userId': SELLER_USER_IDS[i % len(SELLER_USER_IDS)]})
+        for i, listing in enumerate(generate_listings(size, seed=DATASET_SEED))
+    )
+    stats = commit_in_batches(db, operations)
+    if stats['failed']:
+        raise RuntimeError(f"Seeding failed: {stats['errors'][:1]}")
+
+
+def prime_url_cache(path):
+    """Mark every catalog image URL as healthy so runs never touch the network"""
+    from perfect_image_matching import create_comprehensive_image_database
+    from url_cache import UrlHealthCache
+
+    with UrlHealthCache(path, ttl=1e9) as cache:
+        cache.store({'url': image['url'], 'ok': True, 'status': 200}
+                    for image in create_comprehensive_image_database().values())
+
+
+def run_tool(name, size, scratch, verbose=False):
+    """Run one benchmark in a child process and return its measurements"""
+    spec = BENCHMARKS[name]
+    metrics_path = os.path.join(scratch, f"{name}.metrics.json")
+    command = [sys.executable, os.path.join(SCRIPTS_DIR, spec['script']), *spec['args'](size, scratch)]
+    # The child's Firestore client records its own usage (see firestore_metrics.py)
+    env = {**os.environ, ENV_JSON: metrics_path}
+
+    output = None if verbose else subprocess.DEVNULL
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=SCRIPTS_DIR, env=env, stdout=output, stderr=output)
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    metrics = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path) as f:
+            metrics = json.load(f)
+        os.remove(metrics_path)
+    rpcs = metrics.get('rpcs', {})
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return {
+        'tool': name,
+        'size': size,
+        'exit_code': process.returncode,
+        'wall_seconds': round(wall, 3),
+        'docs_per_sec': round(size / wall, 1) if wall > 0 else None,
+        'rpc_count': sum(rpcs.values()),
+        'rpcs': rpcs,
+        'reads': metrics.get('reads', 0),
+        'writes': metrics.get('writes', 0),
+        'deletes': metrics.get('deletes', 0),
+        'bytes_received': metrics.get('bytes_received', 0),
+        'peak_rss_mb': round(peak_rss / 2 ** 20, 1),
+    }
+
+
+def compare_reports(baseline, results, tolerance=DEFAULT_TOLERANCE):
+    """Return human-readable regressions of `results` against a baseline report"""
+    previous = {(r['tool'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['tool'], result['size']))
+        if not before:
+            continue
+        for metric in ('wall_seconds', 'rpc_count', 'reads', 'writes', 'peak_rss_mb'):
+            old, new = before.get(metric), result[metric]
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{result['tool']} @ {result['size']}: {metric} {old} → {new} "
+                                   f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark admin scripts against the Firestore emulator")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"listing counts to benchmark (default: {DEFAULT_SIZES})")
+    parser.add_argument('--tools', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--emulator-host', help="host:port of the emulator (default: from firebase.json)")
+    parser.add_argument('--output', help="report path (default: .cache/benchmark-<timestamp>.json)")
+    parser.add_argument('--compare', metavar='REPORT', help="flag regressions against a previous report")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"relative increase treated as a regression (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--verbose', action='store_true', help="show each tool's output")
+    args = parser.parse_args()
+
+    host = args.emulator_host or os.environ.get('FIRESTORE_EMULATOR_HOST') or emulator_host_from_config()
+    if not emulator_reachable(host):
+        print(f"❌ No Firestore emulator at {host}; start one with: firebase emulators:start --only firestore")
+        return 1
+    # Children inherit this, so every tool talks to the emulator and never to production
+    os.environ['FIRESTORE_EMULATOR_HOST'] = host
+
+    from firestore_client import PROJECT_ID, get_db
+
+    db = get_db()
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        prime_url_cache(os.path.join(scratch, 'url_health.sqlite'))
+        for size in args.sizes:
+            for name in args.tools:
+                reset_emulator(host, PROJECT_ID)
+                if BENCHMARKS[name]['seeded']:
+                    seed_dataset(db, size)
+                result = run_tool(name, size, scratch, verbose=args.verbose)
+                results.append(result)
+                status = "✅" if result['exit_code'] == 0 else f"❌ exit {result['exit_code']}"
+                print(f"{status} {name:<22} {size:>7} docs  {result['wall_seconds']:>8.2f}s  "
+                      f"{result['docs_per_sec'] or 0:>9.0f} docs/s  {result['rpc_count']:>6} RPCs  "
+                      f"{result['reads']:>7} reads  {result['writes'] + result['deletes']:>7} writes  "
+                      f"{result['peak_rss_mb']:>7.1f} MB")
+    reset_emulator(host, PROJECT_ID)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'emulator_host': host,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output = args.output or os.path.join(SCRIPTS_DIR, '.cache', f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {output}")
+
+    failed = [r for r in results if r['exit_code'] != 0]
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"⚠️  Regression: {regression}")
+        if not regressions:
+            print("✅ No regressions against baseline")
+        failed += regressions
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
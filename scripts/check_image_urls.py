@@ -3,51 +3,33 @@
 Check all image URLs currently being used in listings to identify duplicates.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
+import argparse
 from collections import Counter
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments
+from listings_snapshot import add_snapshot_arguments, scan_source, snapshot_from_args
 
-def check_image_urls():
-    """Check all image URLs in listings"""
-    db = initialize_firebase()
-    if not db:
-        return
+def check_image_urls(page_size=DEFAULT_PAGE_SIZE, snapshot=None):
+    """Check all image URLs in listings, or in the local snapshot when given"""
+    db = None
+    if snapshot is None:
+        db = initialize_firebase()
+        if not db:
+            return
     
     try:
-        listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
-        
-        print(f"📊 Found {len(docs)} total listings")
+        # Only the fields used below are transferred
+        docs = scan_source(db, 'listings', fields=['images', 'category', 'title'],
+                           page_size=page_size, snapshot=snapshot)
         
         # Collect all image URLs
         all_image_urls = []
         listings_by_category = {}
+        total_listings = 0
         
         for doc in docs:
+            total_listings += 1
             data = doc.to_dict()
             images = data.get('images', [])
             category = data.get('category', 'unknown')
@@ -64,6 +46,8 @@ def check_image_urls():
             
             all_image_urls.extend(images)
         
+        print(f"📊 Found {total_listings} total listings")
+        
         # Count duplicate URLs
         url_counts = Counter(all_image_urls)
         duplicates = {url: count for url, count in url_counts.items() if count > 1}
@@ -89,4 +73,8 @@ def check_image_urls():
         print(f"❌ Error checking image URLs: {e}")
 
 if __name__ == "__main__":
-    check_image_urls()
+    parser = argparse.ArgumentParser(description="Report image URL usage and duplicates across listings")
+    add_scan_arguments(parser)
+    add_snapshot_arguments(parser)
+    args = parser.parse_args()
+    check_image_urls(page_size=args.page_size, snapshot=snapshot_from_args(args))
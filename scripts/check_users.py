@@ -1,78 +1,75 @@
 #!/usr/bin/env python3
 """
-Check users collection to see what user data exists.
+Check users collection to see what user data exists, and that every listing
+references an existing user.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
+import argparse
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments, scan_collection
+from referential_integrity import (DEFAULT_BLOOM_CAPACITY, DEFAULT_BLOOM_ERROR_RATE, BloomFilter,
+                                   find_orphan_references)
 
-def check_users():
-    """Check users in the database"""
+def check_users(page_size=DEFAULT_PAGE_SIZE, list_users=False, bloom=False,
+                bloom_capacity=DEFAULT_BLOOM_CAPACITY, bloom_error_rate=DEFAULT_BLOOM_ERROR_RATE):
+    """
+    Check that every listing's userId names an existing user.
+    Listings are streamed with only userId projected and each distinct id is
+    looked up once with batched get_all, so the users collection is never
+    loaded. With bloom, distinct ids are tracked in a Bloom filter instead of
+    a set; an orphan can then be missed with probability up to the filter's
+    false-positive rate.
+    """
     db = initialize_firebase()
     if not db:
         return
     
     try:
-        print("👥 Fetching all users...")
-        
-        users_ref = db.collection('users')
-        docs = list(users_ref.stream())
-        
-        print(f"👥 Total users: {len(docs)}")
-        
-        for doc in docs:
-            data = doc.to_dict()
-            print(f"  {doc.id}: {data.get('name', 'No name')} ({data.get('email', 'No email')})")
+        if list_users:
+            print("👥 Fetching all users...")
+            user_count = 0
+            for doc in scan_collection(db, 'users', fields=['name', 'email'], page_size=page_size):
+                data = doc.to_dict()
+                user_count += 1
+                print(f"  {doc.id}: {data.get('name', 'No name')} ({data.get('email', 'No email')})")
+            print(f"👥 Total users: {user_count}")
         
         # Now check listings and their user references
         print("\n📋 Checking listing user references...")
-        listings_ref = db.collection('listings')
-        listing_docs = list(listings_ref.stream())
-        
-        user_ids_in_users = set(doc.id for doc in docs)
-        user_ids_in_listings = set()
+        seen = BloomFilter(bloom_capacity, bloom_error_rate) if bloom else None
+        stats = find_orphan_references(db, 'listings', 'userId', 'users', page_size=page_size, seen=seen)
         
-        for listing_doc in listing_docs:
-            listing_data = listing_doc.to_dict()
-            user_id = listing_data.get('userId')
-            if user_id:
-                user_ids_in_listings.add(user_id)
+        print(f"Listings scanned: {stats['scanned']} ({stats['unreferenced']} without a userId)")
+        print(f"Distinct user IDs referenced: {stats['distinct']} (looked up {stats['looked_up']})")
+        if bloom:
+            print(f"Bloom filter: {seen.memory_bytes() / 1e6:.1f} MB, "
+                  f"expected false-positive (missed orphan) rate {seen.current_error_rate():.2e}")
         
-        print(f"User IDs in users collection: {user_ids_in_users}")
-        print(f"User IDs referenced in listings: {user_ids_in_listings}")
-        
-        missing_users = user_ids_in_listings - user_ids_in_users
+        missing_users = stats['orphans']
         if missing_users:
-            print(f"❌ Missing users (referenced in listings but not in users collection): {missing_users}")
+            print(f"❌ Missing users (referenced in listings but not in users collection): {len(missing_users)}")
+            for user_id in missing_users:
+                print(f"  {user_id}")
         else:
             print("✅ All listing user references are valid")
         
+        return stats
+        
     except Exception as e:
         print(f"❌ Error checking users: {e}")
 
 if __name__ == "__main__":
-    check_users()
+    parser = argparse.ArgumentParser(description="Check that every listing references an existing user")
+    add_scan_arguments(parser)
+    parser.add_argument('--list-users', action='store_true', help="also print every user's name and email")
+    parser.add_argument('--bloom', action='store_true',
+                        help="track referenced ids in a Bloom filter to bound memory for huge collections")
+    parser.add_argument('--bloom-capacity', type=int, default=DEFAULT_BLOOM_CAPACITY,
+                        help=f"distinct user ids the Bloom filter is sized for (default: {DEFAULT_BLOOM_CAPACITY})")
+    parser.add_argument('--bloom-error-rate', type=float, default=DEFAULT_BLOOM_ERROR_RATE,
+                        help="Bloom filter false-positive rate, i.e. the chance of missing an orphan "
+                             f"(default: {DEFAULT_BLOOM_ERROR_RATE})")
+    args = parser.parse_args()
+    check_users(page_size=args.page_size, list_users=args.list_users, bloom=args.bloom,
+                bloom_capacity=args.bloom_capacity, bloom_error_rate=args.bloom_error_rate)
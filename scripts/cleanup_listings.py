@@ -1,44 +1,88 @@
 #!/usr/bin/env python3
 """
 Cleanup script to remove fake listings while preserving specific real listings.
+Deletes are committed in concurrent batches and each committed batch is
+recorded in a local checkpoint file, so an interrupted run resumes where it
+stopped instead of rescanning the collection.
 Requires: pip install firebase-admin
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import sys
+import argparse
+import json
 import os
+import sys
 
-# IDs of listings to keep
-KEEP_LISTINGS = [
-    'eJcyzgfMmfM2eLEmeK62',
-    'qBK9kYmhiYiom99DkluB', 
-    'sNzIfzKXAkpySLNVnUCC',
-    'tdDUoLaNAozUyTriLX3r'
-]
+from batch_writer import FIRESTORE_BATCH_LIMIT, chunked, commit_in_batches, print_write_stats
+from firestore_client import initialize_firebase
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments, scan_collection
+from listing_schema import KEEP_LISTINGS
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        # Path to service account key
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Initialize Firebase Admin SDK
-        cred = credentials.Certificate(service_account_path)
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': 'stan-s-list.firebasestorage.app'
-        })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache',
+                                       'cleanup_listings.checkpoint.jsonl')
+
+
+class DeletionCheckpoint:
+    """
+    Append-only JSON lines file: the first line holds the planned ids and
+    batch size, each later line the index of one committed batch. A torn
+    last line from a crash is ignored on load.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self.ids = None
+        self.batch_size = None
+        self.done = set()
+        self._file = None
+
+    def load(self):
+        """Read an existing checkpoint; returns False when there is none to resume"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if 'ids' in record:
+                    self.ids = record['ids']
+                    self.batch_size = record['batch_size']
+                else:
+                    self.done.add(record['done'])
+        return self.ids is not None
+
+    def start(self, ids, batch_size):
+        """Begin a new checkpoint for a freshly planned deletion"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.ids, self.batch_size, self.done = list(ids), batch_size, set()
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({'ids': self.ids, 'batch_size': batch_size}) + '\n')
+
+    def batches(self):
+        """Planned batches as (index, ids), including ones already committed"""
+        return enumerate(chunked(self.ids, self.batch_size))
+
+    def mark_done(self, index):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self.done.add(index)
+        self._file.write(json.dumps({'done': index}) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
-def cleanup_listings():
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def cleanup_listings(page_size=DEFAULT_PAGE_SIZE, batch_size=FIRESTORE_BATCH_LIMIT, workers=8,
+                     checkpoint_path=DEFAULT_CHECKPOINT_PATH, restart=False):
     """Main cleanup function"""
     print("🔍 Initializing Firebase connection...")
     
@@ -46,69 +90,91 @@ def cleanup_listings():
     if not db:
         return False
     
+    checkpoint = DeletionCheckpoint(checkpoint_path)
     try:
-        print("📊 Fetching all listings...")
-        
-        # Get all listings
         listings_ref = db.collection('listings')
-        docs = listings_ref.stream()
-        
-        listings_to_delete = []
-        listings_to_keep = []
-        total_count = 0
         
-        # Process each document
-        for doc in docs:
-            total_count += 1
-            if doc.id in KEEP_LISTINGS:
-                listings_to_keep.append(doc.id)
-            else:
-                listings_to_delete.append(doc.id)
+        if not restart and checkpoint.load():
+            print(f"⏯️  Resuming from checkpoint: {len(checkpoint.done)} of "
+                  f"{-(-len(checkpoint.ids) // checkpoint.batch_size)} batches already deleted")
+        else:
+            print("📊 Fetching all listings...")
+            
+            # Get all listing IDs; no fields are needed to decide what to delete
+            docs = scan_collection(db, 'listings', fields=[], page_size=page_size)
+            
+            listings_to_delete = []
+            listings_to_keep = []
+            total_count = 0
+            
+            # Process each document
+            for doc in docs:
+                total_count += 1
+                if doc.id in KEEP_LISTINGS:
+                    listings_to_keep.append(doc.id)
+                else:
+                    listings_to_delete.append(doc.id)
+            
+            print(f"📊 Found {total_count} total listings")
+            print(f"✅ Listings to keep ({len(listings_to_keep)}): {listings_to_keep}")
+            print(f"❌ Listings to delete: {len(listings_to_delete)}")
+            
+            if len(listings_to_delete) == 0:
+                print("🎉 No listings to delete!")
+                return True
+            
+            checkpoint.start(listings_to_delete, min(batch_size, FIRESTORE_BATCH_LIMIT))
         
-        print(f"📊 Found {total_count} total listings")
-        print(f"✅ Listings to keep ({len(listings_to_keep)}): {listings_to_keep}")
-        print(f"❌ Listings to delete ({len(listings_to_delete)}): {listings_to_delete}")
+        # Only batches not yet recorded as committed are sent; remaining[i] maps the
+        # i-th batch of this run back to its index in the checkpoint plan
+        remaining = [(index, ids) for index, ids in checkpoint.batches() if index not in checkpoint.done]
+        remaining_count = sum(len(ids) for _, ids in remaining)
+        print(f"\n⚠️  About to delete {remaining_count} listings in {len(remaining)} batches...")
         
-        if len(listings_to_delete) == 0:
-            print("🎉 No listings to delete!")
-            return True
+        operations = (('delete', listings_ref.document(listing_id), None)
+                      for _, ids in remaining for listing_id in ids)
         
-        # Confirm deletion
-        print(f"\n⚠️  About to delete {len(listings_to_delete)} listings...")
+        def report(batch_count, deleted):
+            print(f"🗑️  Deleted batch: {deleted}/{remaining_count} listings")
         
-        # Delete listings in batches (Firestore batch limit is 500)
-        batch_size = 500
-        deleted_count = 0
+        stats = commit_in_batches(db, operations, batch_size=checkpoint.batch_size, max_workers=workers,
+                                  on_batch=report, on_commit=lambda i: checkpoint.mark_done(remaining[i][0]))
+        print_write_stats(stats, label="deletes")
         
-        for i in range(0, len(listings_to_delete), batch_size):
-            batch = db.batch()
-            batch_ids = listings_to_delete[i:i + batch_size]
-            
-            for listing_id in batch_ids:
-                doc_ref = listings_ref.document(listing_id)
-                batch.delete(doc_ref)
-            
-            # Commit the batch
-            batch.commit()
-            deleted_count += len(batch_ids)
-            print(f"🗑️  Deleted batch: {deleted_count}/{len(listings_to_delete)} listings")
+        if stats['failed']:
+            checkpoint.close()
+            print(f"⏸️  {stats['failed']} deletes failed; rerun to resume from {checkpoint.path}")
+            return False
+        checkpoint.remove()
         
-        print(f"\n✅ Successfully deleted {deleted_count} listings")
-        print(f"🔒 Preserved {len(listings_to_keep)} listings")
+        print(f"\n✅ Successfully deleted {stats['written']} listings")
         
-        # Verify final count
-        final_docs = list(listings_ref.stream())
-        print(f"📊 Final count: {len(final_docs)} listings remaining")
+        # Verify final count with an aggregation instead of reading every document
+        final_count = listings_ref.count().get()[0][0].value
+        print(f"📊 Final count: {final_count} listings remaining")
         
         return True
-        
+    
     except Exception as e:
+        checkpoint.close()
         print(f"❌ Error during cleanup: {e}")
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete fake listings while preserving real ones")
+    add_scan_arguments(parser)
+    parser.add_argument('--batch-size', type=int, default=FIRESTORE_BATCH_LIMIT,
+                        help=f"deletes per batch commit (max {FIRESTORE_BATCH_LIMIT})")
+    parser.add_argument('--workers', type=int, default=8, help="batches committed concurrently")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help="file recording committed batches so an interrupted run can resume")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore any existing checkpoint and plan the deletion from a fresh scan")
+    args = parser.parse_args()
+    
     print("🧹 Starting listing cleanup...")
-    success = cleanup_listings()
+    success = cleanup_listings(page_size=args.page_size, batch_size=args.batch_size, workers=args.workers,
+                               checkpoint_path=args.checkpoint, restart=args.restart)
     
     if success:
         print("✅ Cleanup completed successfully!")
@@ -4,16 +4,11 @@ Complete Image Assignment System
 Handles remaining unmatched listings and fixes any broken URLs
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import requests
+import argparse
 
-# Initialize Firebase Admin
-if not firebase_admin._apps:
-    cred = credentials.Certificate('serviceAccountKey.json')
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+from firestore_client import get_db, stamp_updated
+from listing_record import scan_records
+from url_cache import add_cache_arguments, cache_from_args
 
 def get_additional_images() -> dict:
     """Get additional verified working images for remaining listings."""
@@ -71,42 +66,25 @@ def get_additional_images() -> dict:
         }
     }
 
-def verify_image_url(url: str) -> bool:
-    """Verify that an image URL is accessible."""
-    try:
-        response = requests.head(url, timeout=5)
-        return response.status_code == 200
-    except:
-        return False
-
-def assign_remaining_images():
+def assign_remaining_images(url_cache=None):
     """Assign images to remaining unmatched listings."""
     
     print("🔧 Completing image assignments for remaining listings...")
+    # aiohttp is only needed to verify URLs, so load it only when verifying
+    from url_verifier import verify_urls
+    db = get_db()
+    
+    # Get listings without images or with broken images, as compact records
+    all_listings = list(scan_records(db, 'listings', fields=['title', 'images']))
     
-    # Get listings without images or with broken images
-    listings_ref = db.collection('listings')
-    listings = listings_ref.stream()
+    # Check every distinct image URL once, concurrently
+    url_results = verify_urls((url for data in all_listings for url in data.get('images', [])), cache=url_cache)
     
     unmatched_listings = []
-    for listing in listings:
-        data = listing.to_dict()
-        data['id'] = listing.id
-        
-        # Check if listing needs an image
+    for data in all_listings:
+        # A listing needs an image if it has none or any of its images is broken
         images = data.get('images', [])
-        needs_image = False
-        
-        if not images:
-            needs_image = True
-        else:
-            # Check if current image is broken
-            for img_url in images:
-                if not verify_image_url(img_url):
-                    needs_image = True
-                    break
-        
-        if needs_image:
+        if not images or any(not url_results[img_url]['ok'] for img_url in images):
             unmatched_listings.append(data)
     
     print(f"📊 Found {len(unmatched_listings)} listings needing images")
@@ -115,9 +93,10 @@ def assign_remaining_images():
     additional_images = get_additional_images()
     
     # Verify additional images
+    additional_results = verify_urls((img_data["url"] for img_data in additional_images.values()), cache=url_cache)
     valid_additional = {}
     for img_id, img_data in additional_images.items():
-        if verify_image_url(img_data["url"]):
+        if additional_results[img_data["url"]]['ok']:
             valid_additional[img_id] = img_data
         else:
             print(f"❌ Invalid additional URL for {img_id}")
@@ -164,10 +143,10 @@ def assign_remaining_images():
         
         if assigned_image:
             try:
-                listing_ref = db.collection('listings').document(listing['id'])
-                listing_ref.update({
+                listing_ref = db.collection('listings').document(listing.id)
+                listing_ref.update(stamp_updated({
                     'images': [assigned_image['url']]
-                })
+                }))
                 assigned_count += 1
                 print(f"  ✅ Updated '{title}' with image")
                 
@@ -186,16 +165,16 @@ def assign_remaining_images():
     total_with_images = 0
     broken_images = 0
     
-    listings = db.collection('listings').stream()
-    for listing in listings:
-        data = listing.to_dict()
+    final_listings = list(scan_records(db, 'listings', fields=['title', 'images']))
+    final_results = verify_urls((url for data in final_listings for url in data.get('images', [])), cache=url_cache)
+    for data in final_listings:
         total_listings += 1
         
         images = data.get('images', [])
         if images:
             total_with_images += 1
             for img_url in images:
-                if not verify_image_url(img_url):
+                if not final_results[img_url]['ok']:
                     broken_images += 1
                     print(f"  ❌ Broken image in '{data.get('title', 'Unknown')}': {img_url}")
     
@@ -207,6 +186,12 @@ def assign_remaining_images():
     
     if broken_images == 0:
         print(f"  🎉 All images are working correctly!")
+    
+    if url_cache is not None:
+        print(f"  🗄️  URL cache: {url_cache.summary()}")
 
 if __name__ == "__main__":
-    assign_remaining_images()
+    parser = argparse.ArgumentParser(description="Assign images to listings that have none or only broken ones")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    assign_remaining_images(url_cache=cache_from_args(args))
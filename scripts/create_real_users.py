@@ -3,33 +3,11 @@
 Create user records for the real user IDs that are missing.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 from datetime import datetime
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from referential_integrity import find_orphan_references
+from user_provisioning import print_provisioning_stats, provision_users
 
 def create_real_users():
     """Create user records for missing real user IDs"""
@@ -48,40 +26,26 @@ def create_real_users():
         
         print("👥 Creating user records for real user IDs...")
         
-        users_ref = db.collection('users')
-        
-        for i, user_id in enumerate(real_user_ids):
-            user_data = {
+        users = {
+            user_id: {
                 'name': f'User {i+1}',
                 'email': f'user{i+1}@example.com',
                 'joinedAt': datetime.now(),
                 'isActive': True
             }
-            
-            users_ref.document(user_id).set(user_data)
-            print(f"✅ Created user: {user_id} ({user_data['name']})")
+            for i, user_id in enumerate(real_user_ids)
+        }
         
-        print(f"\n🎉 Successfully created {len(real_user_ids)} real user records")
+        # Only missing or changed users are written; reruns are no-ops
+        stats = provision_users(db, users)
+        print_provisioning_stats(stats, {user_id: data['name'] for user_id, data in users.items()})
         
         # Verify no more missing users
         print("\n🔍 Final verification...")
-        docs = list(users_ref.stream())
-        print(f"👥 Total users now: {len(docs)}")
-        
-        # Check if any users are still missing
-        listings_ref = db.collection('listings')
-        listing_docs = list(listings_ref.stream())
-        
-        user_ids_in_users = set(doc.id for doc in docs)
-        user_ids_in_listings = set()
-        
-        for listing_doc in listing_docs:
-            listing_data = listing_doc.to_dict()
-            user_id = listing_data.get('userId')
-            if user_id:
-                user_ids_in_listings.add(user_id)
+        print(f"👥 Total users now: {db.collection('users').count().get()[0][0].value}")
         
-        missing_users = user_ids_in_listings - user_ids_in_users
+        # Check if any users are still missing, streaming only listing userIds
+        missing_users = find_orphan_references(db, 'listings', 'userId', 'users')['orphans']
         if missing_users:
             print(f"❌ Still missing users: {missing_users}")
         else:
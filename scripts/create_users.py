@@ -3,33 +3,10 @@
 Create missing user records for the fake listing user IDs.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 from datetime import datetime
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from user_provisioning import print_provisioning_stats, provision_users
 
 def create_missing_users():
     """Create user records for missing user IDs"""
@@ -104,18 +81,11 @@ def create_missing_users():
         
         print("👥 Creating missing user records...")
         
-        users_ref = db.collection('users')
-        
-        for user_id, user_data in fake_users.items():
-            users_ref.document(user_id).set(user_data)
-            print(f"✅ Created user: {user_id} ({user_data['name']})")
-        
-        print(f"\n🎉 Successfully created {len(fake_users)} user records")
+        # Only missing or changed users are written; reruns are no-ops
+        stats = provision_users(db, fake_users)
+        print_provisioning_stats(stats, {user_id: data['name'] for user_id, data in fake_users.items()})
         
-        # Verify creation
-        print("\n🔍 Verifying user creation...")
-        docs = list(users_ref.stream())
-        print(f"👥 Total users now: {len(docs)}")
+        print(f"👥 Total users now: {db.collection('users').count().get()[0][0].value}")
         
     except Exception as e:
         print(f"❌ Error creating users: {e}")
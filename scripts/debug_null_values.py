@@ -1,91 +1,65 @@
 #!/usr/bin/env python3
 """
 Debug script to find null values in fake listings that might be causing Flutter errors.
+Every fake listing is checked against the per-category schema in listing_schema.py.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
+import argparse
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments
+from listing_checks import ImageTokenCheck
+from listing_schema import KEEP_LISTINGS, ListingValidator
+from listings_snapshot import add_snapshot_arguments, scan_source, snapshot_from_args
 
-def debug_null_values():
-    """Check for null values in fake listings"""
-    db = initialize_firebase()
-    if not db:
-        return
+def debug_null_values(snapshot=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Validate every fake listing against the schema of its category, reading
+    from Firestore or from the local snapshot when given, and print a compact
+    report of null, missing, empty and mistyped fields, and of Firebase
+    Storage image URLs without a download token.
+    """
+    db = None
+    if snapshot is None:
+        db = initialize_firebase()
+        if not db:
+            return
     
     try:
-        listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        validator = ListingValidator()
+        # Fields outside every schema are never checked, so leave them on the server
+        fields = validator.fields
+        docs = scan_source(db, 'listings', fields=fields, page_size=page_size, snapshot=snapshot)
+        
+        print("🔍 Checking fake listings for null values and schema violations...")
+        
+        # Image URLs without a token fail to load in the app; check them in the same scan
+        token_check = ImageTokenCheck()
+        
+        def checked(docs):
+            for doc in docs:
+                if doc.id not in KEEP_LISTINGS:
+                    token_check.add(doc.id, doc.to_dict())
+                yield doc
         
-        # IDs of listings that should be preserved
-        keep_listings = [
-            'eJcyzgfMmfM2eLEmeK62',
-            'qBK9kYmhiYiom99DkluB', 
-            'sNzIfzKXAkpySLNVnUCC',
-            'tdDUoLaNAozUyTriLX3r'
-        ]
+        # Real listings (to be preserved) were not written by the seed scripts
+        report = validator.validate_documents(checked(docs), skip_ids=set(KEEP_LISTINGS))
+        report.print_report()
         
-        print("🔍 Checking for null values in fake listings...")
+        tokens = token_check.finish()
+        print("\n🔑 Image URL tokens:")
+        token_check.print_report(tokens)
+        if tokens['missing_token']:
+            print(f"  ❌ MISSING TOKEN in {tokens['missing_token']} image URLs!")
         
-        for doc in docs[:3]:  # Check first 3 docs
-            if doc.id not in keep_listings:  # Only check fake listings
-                print(f"\n📄 Checking fake listing: {doc.id}")
-                data = doc.to_dict()
-                
-                for key, value in data.items():
-                    if value is None:
-                        print(f"  ❌ NULL VALUE: {key} = None")
-                    elif isinstance(value, list):
-                        if not value:
-                            print(f"  ⚠️  EMPTY LIST: {key} = []")
-                        elif any(item is None for item in value):
-                            print(f"  ❌ NULL IN LIST: {key} contains None values")
-                        else:
-                            print(f"  ✅ {key}: list with {len(value)} items")
-                    elif isinstance(value, dict):
-                        if any(v is None for v in value.values()):
-                            print(f"  ❌ NULL IN DICT: {key} contains None values")
-                        else:
-                            print(f"  ✅ {key}: dict with {len(value)} keys")
-                    elif isinstance(value, str):
-                        if value == "":
-                            print(f"  ⚠️  EMPTY STRING: {key} = ''")
-                        else:
-                            print(f"  ✅ {key}: '{value[:50]}{'...' if len(value) > 50 else ''}'")
-                    else:
-                        print(f"  ✅ {key}: {type(value).__name__} = {value}")
-                
-                # Check image URLs specifically
-                if 'images' in data and data['images']:
-                    print(f"  🖼️  Image URL: {data['images'][0]}")
-                    has_token = 'token=' in data['images'][0]
-                    print(f"  🔑 Has token: {has_token}")
-                    if not has_token:
-                        print(f"  ❌ MISSING TOKEN in image URL!")
-                
-                break  # Just check one fake listing
+        return {**report.to_dict(), 'image_tokens': tokens}
         
     except Exception as e:
         print(f"❌ Error debugging listings: {e}")
 
 if __name__ == "__main__":
-    debug_null_values()
+    parser = argparse.ArgumentParser(description="Look for null values in fake listings")
+    add_scan_arguments(parser)
+    add_snapshot_arguments(parser)
+    args = parser.parse_args()
+    debug_null_values(snapshot=snapshot_from_args(args), page_size=args.page_size)
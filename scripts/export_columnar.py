@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the listings collection for fast local analytics.
+Listings are streamed (from Firestore or the local snapshot) into a Parquet
+file, or an Arrow IPC file when the path ends in .arrow/.feather, with the
+low-cardinality string fields (category, location, status, userId)
+dictionary-encoded. Analysis code memory-maps the file and answers
+category/price/location/status questions with vectorized group-bys instead of
+building a list of dicts and looping over it in Python.
+
+Usage:
+  python export_columnar.py                     # export from Firestore
+  python export_columnar.py --offline           # export from the local snapshot
+  python export_columnar.py --report            # reports from an existing export
+Requires: pip install pyarrow
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments
+from listing_stats import CATEGORY_IDS, STATUS_FILTERS, UNKNOWN_CATEGORY, print_listing_stats
+from listings_snapshot import add_snapshot_arguments, scan_source, snapshot_from_args
+
+DEFAULT_EXPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'listings.parquet')
+DEFAULT_ROW_GROUP_SIZE = 100_000
+IPC_SUFFIXES = ('.arrow', '.feather')
+
+# Repeated values are stored once per file (or row group) and referenced by index
+DICTIONARY_FIELDS = ('category', 'location', 'status', 'userId')
+STRING_FIELDS = ('title',)
+TIMESTAMP_FIELDS = ('createdAt', 'updatedAt')
+
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+_TIMESTAMP = pa.timestamp('us', tz='UTC')
+LISTINGS_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('title', pa.string()),
+    ('category', _DICTIONARY),
+    ('location', _DICTIONARY),
+    ('status', _DICTIONARY),
+    ('userId', _DICTIONARY),
+    ('isActive', pa.bool_()),
+    ('price', pa.float64()),
+    ('images', pa.list_(pa.string())),
+    ('createdAt', _TIMESTAMP),
+    ('updatedAt', _TIMESTAMP),
+])
+EXPORT_FIELDS = [name for name in LISTINGS_SCHEMA.names if name != 'id']
+
+
+def _string(value):
+    return value if isinstance(value, str) else None
+
+
+def _number(value):
+    # Matches Firestore aggregations, which skip non-numeric prices
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def _record_batch(rows):
+    """Build a record batch from (id, data) pairs, coercing values to the schema's types"""
+    columns = {name: [] for name in LISTINGS_SCHEMA.names}
+    for doc_id, data in rows:
+        columns['id'].append(doc_id)
+        for field in STRING_FIELDS + DICTIONARY_FIELDS:
+            columns[field].append(_string(data.get(field)))
+        for field in TIMESTAMP_FIELDS:
+            value = data.get(field)
+            columns[field].append(value if isinstance(value, datetime) else None)
+        is_active = data.get('isActive')
+        columns['isActive'].append(is_active if isinstance(is_active, bool) else None)
+        columns['price'].append(_number(data.get('price')))
+        images = data.get('images')
+        columns['images'].append([url for url in images if isinstance(url, str)]
+                                 if isinstance(images, list) else None)
+
+    arrays = []
+    for field in LISTINGS_SCHEMA:
+        if field.type == _DICTIONARY:
+            arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=LISTINGS_SCHEMA)
+
+
+def _batches(docs, batch_size):
+    rows = []
+    for doc in docs:
+        rows.append((doc.id, doc.to_dict()))
+        if len(rows) >= batch_size:
+            yield _record_batch(rows)
+            rows = []
+    if rows:
+        yield _record_batch(rows)
+
+
+def export_listings(db, path=DEFAULT_EXPORT_PATH, page_size=DEFAULT_PAGE_SIZE, snapshot=None,
+                    row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Write the listings collection to `path` and return the number of rows.
+    Parquet is written one row group at a time, so memory stays bounded; an
+    Arrow IPC file needs one dictionary per column for the whole file, so it
+    is assembled in memory (as compact Arrow arrays) before being written.
+    The file is written next to `path` and moved into place when complete.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    docs = scan_source(db, 'listings', fields=EXPORT_FIELDS, page_size=page_size, snapshot=snapshot)
+    partial_path = path + '.partial'
+    rows = 0
+
+    if path.endswith(IPC_SUFFIXES):
+        table = pa.Table.from_batches(_batches(docs, row_group_size), schema=LISTINGS_SCHEMA)
+        options = pa.ipc.IpcWriteOptions(unify_dictionaries=True)
+        with pa.OSFile(partial_path, 'wb') as sink, pa.ipc.new_file(sink, LISTINGS_SCHEMA, options=options) as writer:
+            writer.write_table(table)
+        rows = table.num_rows
+    else:
+        with pq.ParquetWriter(partial_path, LISTINGS_SCHEMA, compression='zstd') as writer:
+            for batch in _batches(docs, row_group_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+
+    os.replace(partial_path, path)
+    return rows
+
+
+def load_listings(path=DEFAULT_EXPORT_PATH, columns=None):
+    """
+    Load an export as an Arrow table. Arrow IPC files are memory-mapped and
+    not copied; Parquet files are memory-mapped and decoded column by column,
+    so passing only the needed `columns` keeps loading fast.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No listings export at {path}; run export_columnar.py first")
+    if path.endswith(IPC_SUFFIXES):
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        table = table.select(columns) if columns else table
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    # Each Parquet row group has its own dictionaries; group-bys need one per column
+    return table.unify_dictionaries()
+
+
+def listing_stats_from_table(table, categories=CATEGORY_IDS, statuses=STATUS_FILTERS):
+    """Compute the same statistics as listing_stats.compute_listing_stats, vectorized"""
+    grouped = table.group_by('category').aggregate([('id', 'count'), ('price', 'sum'), ('price', 'mean')])
+    rows = grouped.to_pylist()
+    by_category = {row['category']: row for row in rows if row['category'] is not None}
+    # A missing category is exported as null
+    others = sorted(((row['category'] if row['category'] is not None else UNKNOWN_CATEGORY, row['id_count'])
+                     for row in rows if row['category'] not in categories), key=lambda pair: -pair[1])
+    return {
+        'total': table.num_rows,
+        'categories': {
+            category: {
+                'count': by_category[category]['id_count'] if category in by_category else 0,
+                'total_price': (by_category[category]['price_sum'] or 0) if category in by_category else 0,
+                'average_price': by_category[category]['price_mean'] if category in by_category else None,
+            }
+            for category in categories
+        },
+        'statuses': {
+            label: pc.sum(pc.equal(table[field], value)).as_py() or 0
+            for label, (field, _, value) in statuses.items()
+        },
+        'other_categories': dict(others),
+    }
+
+
+def value_counts(table, column, top=None):
+    """[(value, count)] for `column`, most frequent first"""
+    counts = table.group_by(column).aggregate([('id', 'count')]).sort_by([('id_count', 'descending')])
+    pairs = list(zip(counts[column].to_pylist(), counts['id_count'].to_pylist()))
+    return pairs[:top] if top else pairs
+
+
+def location_report(table, top=20):
+    """[(location, listings, average price)] for the `top` busiest locations"""
+    grouped = (table.group_by('location')
+               .aggregate([('id', 'count'), ('price', 'mean')])
+               .sort_by([('id_count', 'descending')]))
+    rows = zip(grouped['location'].to_pylist(), grouped['id_count'].to_pylist(), grouped['price_mean'].to_pylist())
+    return list(rows)[:top]
+
+
+def image_references(table):
+    """
+    One row per (listing, distinct image URL): url, id, title, category.
+    An image repeated within a listing's own images counts once.
+    """
+    images = table['images'].combine_chunks()
+    parents = pc.list_parent_indices(images)
+    references = pa.table({
+        'url': pc.list_flatten(images),
+        'id': pc.take(table['id'], parents),
+        'title': pc.take(table['title'], parents),
+        'category': pc.take(table['category'], parents),
+    })
+    # Keep the first reference of each (listing, url) pair, preserving order
+    first = references.append_column('row', pa.array(range(references.num_rows), type=pa.int64())) \
+        .group_by(['id', 'url']).aggregate([('row', 'min')])['row_min']
+    return references.take(pc.take(first, pc.sort_indices(first)))
+
+
+def listings_without_images(table):
+    """Titles of listings with no images"""
+    lengths = pc.fill_null(pc.list_value_length(table['images']), 0)
+    return table.filter(pc.equal(lengths, 0))['title'].to_pylist()
+
+
+def print_columnar_reports(table, top=10):
+    print_listing_stats(listing_stats_from_table(table))
+
+    print(f"\n📍 Top {top} locations:")
+    for location, count, average in location_report(table, top):
+        average = f"${average:,.2f}" if average is not None else "n/a"
+        print(f"  {location or 'unknown'}: {count} (avg {average})")
+
+    print(f"\n👤 Top {top} sellers:")
+    for user_id, count in value_counts(table, 'userId', top):
+        print(f"  {user_id or 'unknown'}: {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export listings to a columnar file for local analytics")
+    parser.add_argument('--output', default=DEFAULT_EXPORT_PATH,
+                        help="export path; .arrow/.feather writes Arrow IPC, anything else Parquet")
+    parser.add_argument('--row-group-size', type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help=f"rows per Parquet row group (default: {DEFAULT_ROW_GROUP_SIZE})")
+    parser.add_argument('--report', action='store_true',
+                        help="print category/price/location reports from an existing export instead of exporting")
+    add_scan_arguments(parser)
+    add_snapshot_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.report:
+        snapshot = snapshot_from_args(args)
+        db = None
+        if snapshot is None:
+            from firestore_client import get_db
+            db = get_db()
+        start = time.perf_counter()
+        rows = export_listings(db, args.output, page_size=args.page_size, snapshot=snapshot,
+                               row_group_size=args.row_group_size)
+        print(f"📦 Exported {rows} listings to {args.output} ({os.path.getsize(args.output) / 2 ** 20:.1f} MB, "
+              f"{time.perf_counter() - start:.1f}s)")
+    else:
+        start = time.perf_counter()
+        table = load_listings(args.output, columns=['id', 'category', 'location', 'status', 'userId',
+                                                    'isActive', 'price'])
+        print_columnar_reports(table)
+        print(f"\n⏱️  Reports computed in {time.perf_counter() - start:.3f}s")
@@ -4,66 +4,103 @@ Final Image Analysis and Verification
 Comprehensive analysis of image assignments for uniqueness and quality
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import requests
+import argparse
 from collections import defaultdict
 
-# Initialize Firebase Admin
-if not firebase_admin._apps:
-    cred = credentials.Certificate('serviceAccountKey.json')
-    firebase_admin.initialize_app(cred)
+from firestore_client import get_db
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments
+from listings_snapshot import add_snapshot_arguments, scan_source, snapshot_from_args
+from url_cache import add_cache_arguments, cache_from_args
 
-db = firestore.client()
-
-def analyze_final_images():
-    """Perform comprehensive analysis of all assigned images."""
-    
-    print("🔍 Final Image Analysis and Verification")
-    print("=" * 50)
-    
-    # Get all listings
-    listings_ref = db.collection('listings')
-    listings = listings_ref.stream()
-    
-    all_listings = []
-    for listing in listings:
-        data = listing.to_dict()
-        data['id'] = listing.id
-        all_listings.append(data)
+def _usage_from_scan(page_size, snapshot):
+    """Record which listings reference each image, covering every image of every listing"""
+    db = get_db() if snapshot is None else None
     
-    print(f"📊 Analyzing {len(all_listings)} listings...")
+    # Get all listings, transferring only the fields analyzed below
+    listings = scan_source(db, 'listings', fields=['title', 'category', 'images'],
+                           page_size=page_size, snapshot=snapshot)
     
-    # Track image usage
     image_usage = defaultdict(list)
-    broken_images = []
     category_breakdown = defaultdict(int)
-    
-    # Analyze each listing
-    for listing in all_listings:
-        title = listing.get('title', 'Unknown')
-        category = listing.get('category', 'unknown')
-        images = listing.get('images', [])
+    no_image_titles = []
+    listing_count = 0
+    for listing in listings:
+        data = listing.to_dict()
+        listing_count += 1
+        title = data.get('title', 'Unknown')
+        category = data.get('category', 'unknown')
+        images = data.get('images', [])
         
         category_breakdown[category] += 1
         
         if images:
-            img_url = images[0]  # Get first image
-            image_usage[img_url].append({
-                'title': title,
-                'category': category,
-                'id': listing['id']
-            })
-            
-            # Check if image is accessible
-            try:
-                response = requests.head(img_url, timeout=5)
-                if response.status_code != 200:
-                    broken_images.append({'title': title, 'url': img_url, 'status': response.status_code})
-            except Exception as e:
-                broken_images.append({'title': title, 'url': img_url, 'error': str(e)})
+            for img_url in dict.fromkeys(images):
+                image_usage[img_url].append({
+                    'title': title,
+                    'category': category,
+                    'id': listing.id
+                })
         else:
-            print(f"  ⚠️  No image: {title}")
+            no_image_titles.append(title)
+    return image_usage, category_breakdown, no_image_titles, listing_count
+
+def _usage_from_export(path):
+    """The same usage data as _usage_from_scan, computed from a columnar export"""
+    # pyarrow is optional, so load it only when reading an export
+    from export_columnar import image_references, listings_without_images, load_listings, value_counts
+    
+    table = load_listings(path, columns=['id', 'title', 'category', 'images'])
+    references = image_references(table)
+    
+    image_usage = defaultdict(list)
+    for url, listing_id, title, category in zip(*(references[name].to_pylist()
+                                                  for name in ('url', 'id', 'title', 'category'))):
+        image_usage[url].append({
+            'title': title if title is not None else 'Unknown',
+            'category': category if category is not None else 'unknown',
+            'id': listing_id
+        })
+    category_breakdown = {category if category is not None else 'unknown': count
+                          for category, count in value_counts(table, 'category')}
+    no_image_titles = [title if title is not None else 'Unknown' for title in listings_without_images(table)]
+    return image_usage, category_breakdown, no_image_titles, table.num_rows
+
+def analyze_final_images(url_cache=None, page_size=DEFAULT_PAGE_SIZE, snapshot=None, columnar=None):
+    """
+    Perform comprehensive analysis of all assigned images.
+    With `columnar`, the path of an export_columnar.py export, listings are
+    read from that file and grouped with vectorized operations.
+    """
+    
+    print("🔍 Final Image Analysis and Verification")
+    print("=" * 50)
+    
+    if columnar is not None:
+        image_usage, category_breakdown, no_image_titles, listing_count = _usage_from_export(columnar)
+    else:
+        image_usage, category_breakdown, no_image_titles, listing_count = _usage_from_scan(page_size, snapshot)
+    
+    print(f"📊 Analyzing {listing_count} listings...")
+    for title in no_image_titles:
+        print(f"  ⚠️  No image: {title}")
+    image_references = sum(len(usages) for usages in image_usage.values())
+    broken_images = []
+    
+    # Check each distinct URL once, then fan the result back to every listing using it
+    # (aiohttp is only needed to verify URLs, so load it only when verifying)
+    from url_verifier import verify_urls
+    url_results = verify_urls(image_usage, cache=url_cache)
+    print(f"🌐 Checked {len(url_results)} distinct URLs for {image_references} image references")
+    
+    for img_url, usages in image_usage.items():
+        result = url_results[img_url]
+        if result['ok']:
+            continue
+        for usage in usages:
+            if result['error']:
+                broken_images.append({'title': usage['title'], 'url': img_url, 'error': result['error']})
+            else:
+                broken_images.append({'title': usage['title'], 'url': img_url, 'status': result['status']})
     
     # Calculate statistics
     total_images = len(image_usage)
@@ -71,12 +108,14 @@ def analyze_final_images():
     duplicate_images = total_images - unique_images
     
     print(f"\n📈 Image Statistics:")
-    print(f"  Total listings: {len(all_listings)}")
+    print(f"  Total listings: {listing_count}")
     print(f"  Total unique images: {total_images}")
     print(f"  Truly unique (1:1): {unique_images}")
     print(f"  Duplicate images: {duplicate_images}")
     print(f"  Uniqueness rate: {unique_images/total_images*100:.1f}%")
     print(f"  Broken images: {len(broken_images)}")
+    if url_cache is not None:
+        print(f"  URL cache: {url_cache.summary()}")
     
     # Category breakdown
     print(f"\n📂 Category Breakdown:")
@@ -173,7 +212,7 @@ def analyze_final_images():
         print(f"  ⚠️  NEEDS IMPROVEMENT before production deployment")
     
     return {
-        'total_listings': len(all_listings),
+        'total_listings': listing_count,
         'unique_images': unique_images,
         'total_images': total_images,
         'broken_images': len(broken_images),
@@ -182,7 +221,15 @@ def analyze_final_images():
     }
 
 if __name__ == "__main__":
-    results = analyze_final_images()
+    parser = argparse.ArgumentParser(description="Analyze image uniqueness and health across all listings")
+    add_cache_arguments(parser)
+    add_scan_arguments(parser)
+    add_snapshot_arguments(parser)
+    parser.add_argument('--columnar', metavar='PATH',
+                        help="read listings from an export_columnar.py export (needs pyarrow)")
+    args = parser.parse_args()
+    results = analyze_final_images(url_cache=cache_from_args(args), page_size=args.page_size,
+                                   snapshot=snapshot_from_args(args), columnar=args.columnar)
     print(f"\n📋 Summary Report:")
     print(f"  Listings: {results['total_listings']}")
     print(f"  Unique Images: {results['unique_images']}/{results['total_images']}")
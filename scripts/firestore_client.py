@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Shared Firestore client for the admin scripts.
+Firebase is initialized lazily on first use and the client is memoized, so
+importing a script (or running it with --help) loads no credentials and
+opens no channels, and several tools run in one process share one app and
+one gRPC channel. When FIRESTORE_EMULATOR_HOST is set the client talks to the
+local emulator (see the emulators section of firebase.json) and no service
+account key is needed. Setting FIRESTORE_METRICS* instruments the client's
+channel with read/write/latency counters (see firestore_metrics.py).
+Requires: pip install firebase-admin
+"""
+
+import os
+import threading
+
+SERVICE_ACCOUNT_PATH = os.environ.get(
+    'GOOGLE_APPLICATION_CREDENTIALS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'serviceAccountKey.json'))
+STORAGE_BUCKET = 'stan-s-list.firebasestorage.app'
+PROJECT_ID = 'stan-s-list'
+
+_db = None
+_lock = threading.Lock()
+
+
+def get_db():
+    """
+    Return the shared Firestore client, initializing Firebase on first call.
+    Raises if the service account key is missing or initialization fails.
+    """
+    global _db
+    if _db is None:
+        with _lock:
+            if _db is None:
+                # Channels are instrumented as they are created, so this must precede the client
+                from firestore_metrics import install_from_env
+                install_from_env()
+            if _db is None and os.environ.get('FIRESTORE_EMULATOR_HOST'):
+                # The emulator accepts anonymous credentials; never load the production key
+                from google.cloud import firestore
+                _db = firestore.Client(project=PROJECT_ID)
+            elif _db is None:
+                # Imported here so scripts only pay for firebase_admin when they touch Firestore
+                import firebase_admin
+                from firebase_admin import credentials, firestore
+
+                try:
+                    firebase_admin.get_app()
+                except ValueError:
+                    if not os.path.exists(SERVICE_ACCOUNT_PATH):
+                        raise FileNotFoundError(f"Service account key not found at: {SERVICE_ACCOUNT_PATH}")
+                    cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
+                    firebase_admin.initialize_app(cred, {
+                        'storageBucket': STORAGE_BUCKET
+                    })
+
+                _db = firestore.client()
+    return _db
+
+
+def stamp_updated(fields):
+    """
+    Return `fields` with updatedAt set to the server commit time, so the
+    incremental snapshot sync (see listings_snapshot.py) picks the write up.
+    """
+    from google.cloud.firestore import SERVER_TIMESTAMP
+    return {**fields, 'updatedAt': SERVER_TIMESTAMP}
+
+
+def initialize_firebase():
+    """Initialize Firebase Admin SDK, returning the shared client or None on failure"""
+    try:
+        return get_db()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error initializing Firebase: {e}")
+        return None
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Firestore cost and latency instrumentation for the admin scripts.
+A gRPC interceptor on the client's channel sees every Firestore RPC, so it
+counts what Firestore bills (documents read by queries and gets, documents
+written and deleted by successful commits) along with bytes sent and
+received and a latency histogram per RPC method, without touching any
+script code.
+
+Enable it with environment variables before running any script:
+  FIRESTORE_METRICS=1              print a summary at exit
+  FIRESTORE_METRICS_JSON=PATH      write the metrics as JSON at exit
+  FIRESTORE_METRICS_PROM=PATH      write the metrics in Prometheus text format at exit
+Requires: pip install firebase-admin
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+ENV_SUMMARY = 'FIRESTORE_METRICS'
+ENV_JSON = 'FIRESTORE_METRICS_JSON'
+ENV_PROMETHEUS = 'FIRESTORE_METRICS_PROM'
+
+# Queries are billed at least one read even when they match no documents
+MIN_ONE_READ_METHODS = frozenset(('RunQuery',))
+
+
+def _pb(message):
+    """Raw protobuf for a proto-plus message (the transport passes proto-plus objects)"""
+    to_pb = getattr(type(message), 'pb', None)
+    return to_pb(message) if to_pb else message
+
+
+def _byte_size(message):
+    try:
+        return _pb(message).ByteSize()
+    except Exception:
+        return 0
+
+
+class FirestoreMetrics:
+    """Thread-safe counters and per-method latency histograms for Firestore RPCs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+        self.latency_sum = defaultdict(float)
+
+    def record_request(self, request):
+        with self._lock:
+            self.bytes_sent += _byte_size(request)
+
+    def record_response(self, response, request=None):
+        """
+        Count documents returned by queries, gets and aggregations, and the
+        writes and deletes of the successful `request` this answers (so a
+        retried commit is counted once). Returns the number of reads counted.
+        """
+        pb = _pb(response)
+        fields = {field.name for field, _ in pb.ListFields()}
+        writes = getattr(_pb(request), 'writes', None) if request is not None else None
+        # BatchWrite is not atomic: only writes with an OK status were applied
+        statuses = list(pb.status) if 'status' in fields else None
+        with self._lock:
+            self.bytes_received += pb.ByteSize()
+            for i, write in enumerate(writes or ()):
+                if statuses is not None and i < len(statuses) and statuses[i].code != 0:
+                    continue
+                if write.WhichOneof('operation') == 'delete':
+                    self.deletes += 1
+                else:
+                    self.writes += 1
+            # Missing documents in a get are billed as reads too
+            if fields & {'document', 'found', 'missing', 'result'}:
+                self.reads += 1
+                return 1
+        return 0
+
+    def record_reads(self, count):
+        with self._lock:
+            self.reads += count
+
+    def record_call(self, method, seconds, error=False):
+        milliseconds = seconds * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            self.calls[method] += 1
+            if error:
+                self.errors[method] += 1
+            self.latency_buckets[method][bucket] += 1
+            self.latency_sum[method] += seconds
+
+    def _percentile(self, method, fraction):
+        """Upper bound of the bucket holding the given fraction of calls"""
+        counts = self.latency_buckets[method]
+        target = fraction * sum(counts)
+        running = 0
+        for bound, count in zip((*LATENCY_BUCKETS_MS, float('inf')), counts):
+            running += count
+            if running >= target:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'reads': self.reads,
+                'writes': self.writes,
+                'deletes': self.deletes,
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'rpcs': dict(self.calls),
+                'errors': dict(self.errors),
+                'latency': {
+                    method: {
+                        'buckets_ms': dict(zip([*map(str, LATENCY_BUCKETS_MS), '+Inf'], counts)),
+                        'sum_seconds': round(self.latency_sum[method], 6),
+                    }
+                    for method, counts in self.latency_buckets.items()
+                },
+            }
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        data = self.to_dict()
+        lines = []
+        for name, help_text in (('reads', 'Documents read'), ('writes', 'Documents written'),
+                                ('deletes', 'Documents deleted'), ('bytes_sent', 'Request bytes'),
+                                ('bytes_received', 'Response bytes')):
+            lines += [f"# HELP firestore_{name}_total {help_text}",
+                      f"# TYPE firestore_{name}_total counter",
+                      f"firestore_{name}_total {data[name]}"]
+
+        lines += ["# HELP firestore_rpcs_total Firestore RPCs by method",
+                  "# TYPE firestore_rpcs_total counter"]
+        lines += [f'firestore_rpcs_total{{method="{m}"}} {n}' for m, n in data['rpcs'].items()]
+        lines += ["# HELP firestore_rpc_errors_total Failed Firestore RPCs by method",
+                  "# TYPE firestore_rpc_errors_total counter"]
+        lines += [f'firestore_rpc_errors_total{{method="{m}"}} {n}' for m, n in data['errors'].items()]
+
+        lines += ["# HELP firestore_rpc_latency_seconds Firestore RPC latency",
+                  "# TYPE firestore_rpc_latency_seconds histogram"]
+        for method, latency in data['latency'].items():
+            cumulative = 0
+            for bound, count in latency['buckets_ms'].items():
+                cumulative += count
+                le = bound if bound == '+Inf' else str(int(bound) / 1000)
+                lines.append(f'firestore_rpc_latency_seconds_bucket{{method="{method}",le="{le}"}} {cumulative}')
+            lines.append(f'firestore_rpc_latency_seconds_sum{{method="{method}"}} {latency["sum_seconds"]}')
+            lines.append(f'firestore_rpc_latency_seconds_count{{method="{method}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self):
+        data = self.to_dict()
+        print(f"\n📟 Firestore usage: {data['reads']} reads, {data['writes']} writes, {data['deletes']} deletes, "
+              f"{data['bytes_received'] / 1024:.1f} KiB received, {data['bytes_sent'] / 1024:.1f} KiB sent")
+        for method, count in sorted(data['rpcs'].items(), key=lambda item: -item[1]):
+            mean_ms = self.latency_sum[method] / count * 1000
+            errors = f", {data['errors'][method]} failed" if method in data['errors'] else ""
+            print(f"  {method:<26} {count:>7} calls  mean {mean_ms:7.1f} ms  "
+                  f"p50 ≤{self._percentile(method, 0.5)} ms  p99 ≤{self._percentile(method, 0.99)} ms{errors}")
+
+
+class _StreamCounter:
+    """
+    Forwards a streaming call's responses while recording them, then the
+    call's latency once it ends, fails, is cancelled or is abandoned.
+    """
+
+    # Stays True if __init__ never ran, so __del__ has nothing to record
+    _finished = True
+
+    def __init__(self, call, metrics, method, start):
+        self._call = call
+        self._metrics = metrics
+        self._method = method
+        self._start = start
+        self._reads = 0
+        self._finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._call)
+        except StopIteration:
+            self._finish(error=False)
+            raise
+        except Exception:
+            self._finish(error=True)
+            raise
+        self._reads += self._metrics.record_response(response)
+        return response
+
+    def _finish(self, error):
+        if not self._finished:
+            self._finished = True
+            if not error and not self._reads and self._method in MIN_ONE_READ_METHODS:
+                self._metrics.record_reads(1)
+            self._metrics.record_call(self._method, time.perf_counter() - self._start, error)
+
+    def cancel(self):
+        cancelled = self._call.cancel()
+        self._finish(error=False)
+        return cancelled
+
+    def __del__(self):
+        # Streams dropped before exhaustion (e.g. islice over a scan) still count
+        self._finish(error=False)
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
+
+
+def _make_interceptor(metrics):
+    import grpc
+
+    class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor,
+                             grpc.StreamUnaryClientInterceptor, grpc.StreamStreamClientInterceptor):
+        def intercept_unary_unary(self, continuation, details, request):
+            method = details.method.rsplit('/', 1)[-1]
+            metrics.record_request(request)
+            start = time.perf_counter()
+            outcome = continuation(details, request)
+
+            def done(future):
+                error = future.exception() is not None
+                if not error:
+                    metrics.record_response(future.result(), request)
+                metrics.record_call(method, time.perf_counter() - start, error)
+
+            outcome.add_done_callback(done)
+            return outcome
+
+        def intercept_unary_stream(self, continuation, details, request):
+            metrics.record_request(request)
+            start = time.perf_counter()
+            return _StreamCounter(continuation(details, request), metrics,
+                                  details.method.rsplit('/', 1)[-1], start)
+
+        def _count_only(self, continuation, details, request_or_iterator):
+            start = time.perf_counter()
+            call = continuation(details, request_or_iterator)
+            metrics.record_call(details.method.rsplit('/', 1)[-1], time.perf_counter() - start)
+            return call
+
+        intercept_stream_unary = intercept_stream_stream = _count_only
+
+    return MetricsInterceptor()
+
+
+_metrics = None
+_install_lock = threading.Lock()
+
+
+def install(metrics=None):
+    """
+    Instrument every Firestore channel created from now on and return the
+    metrics object. Must run before the client makes its first call;
+    firestore_client.get_db does this when the environment asks for it.
+    """
+    global _metrics
+    with _install_lock:
+        if _metrics is not None:
+            return _metrics
+        import grpc
+        from google.api_core import grpc_helpers
+
+        _metrics = metrics or FirestoreMetrics()
+        interceptor = _make_interceptor(_metrics)
+
+        # Production channels come from grpc_helpers, emulator channels from grpc directly
+        create_channel = grpc_helpers.create_channel
+        insecure_channel = grpc.insecure_channel
+        grpc_helpers.create_channel = lambda *a, **kw: grpc.intercept_channel(create_channel(*a, **kw), interceptor)
+        grpc.insecure_channel = lambda *a, **kw: grpc.intercept_channel(insecure_channel(*a, **kw), interceptor)
+        return _metrics
+
+
+def get_metrics():
+    """The installed FirestoreMetrics, or None when instrumentation is off"""
+    return _metrics
+
+
+def export(metrics, json_path=None, prometheus_path=None, summary=False):
+    if summary:
+        metrics.print_summary()
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(metrics.to_dict(), f, indent=2)
+    if prometheus_path:
+        with open(prometheus_path, 'w') as f:
+            f.write(metrics.to_prometheus())
+
+
+def install_from_env():
+    """Install instrumentation and its exit-time export if any FIRESTORE_METRICS* variable is set"""
+    summary = os.environ.get(ENV_SUMMARY, '') not in ('', '0')
+    json_path = os.environ.get(ENV_JSON)
+    prometheus_path = os.environ.get(ENV_PROMETHEUS)
+    if not (summary or json_path or prometheus_path):
+        return None
+    if _metrics is not None:
+        return _metrics
+    metrics = install()
+    atexit.register(export, metrics, json_path, prometheus_path, summary)
+    return metrics
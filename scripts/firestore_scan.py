@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory scans over Firestore collections.
+Reads a collection page by page using cursors, optionally projecting only
+the fields a script needs, and yields documents lazily.
+Requires: pip install firebase-admin
+"""
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def scan_collection(db, collection, fields=None, page_size=DEFAULT_PAGE_SIZE, query=None, order_by=None):
+    """
+    Yield document snapshots from `collection` one page at a time.
+
+    `fields` limits the transferred data to those fields via select(); pass an
+    empty list to fetch document ids only. `query` may be a pre-filtered query
+    on the collection; when it has an inequality filter, pass that field as
+    `order_by` so it leads the sort order as Firestore requires. Pages are
+    ordered by document id (after `order_by`) and continued with start_after(),
+    so only one page is held in memory.
+    """
+    base = query if query is not None else db.collection(collection)
+    if fields is not None:
+        # An empty projection means "all fields" to Firestore; __name__ alone returns ids only
+        base = base.select(list(fields) or ['__name__'])
+    if order_by is not None:
+        base = base.order_by(order_by)
+    base = base.order_by('__name__').limit(page_size)
+
+    last_doc = None
+    while True:
+        page_query = base.start_after(last_doc) if last_doc is not None else base
+        page = list(page_query.stream())
+        yield from page
+        if len(page) < page_size:
+            return
+        last_doc = page[-1]
+
+
+def add_scan_arguments(parser):
+    """Add the shared --page-size option to an argparse parser"""
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"documents fetched per request while scanning (default: {DEFAULT_PAGE_SIZE})")
@@ -3,32 +3,8 @@
 Fix broken Unsplash image URLs that are returning 404 errors.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase, stamp_updated
+from listing_record import scan_records
 
 def fix_broken_image_urls():
     """Fix specific broken Unsplash URLs with working alternatives"""
@@ -48,14 +24,13 @@ def fix_broken_image_urls():
     
     try:
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        docs = list(scan_records(db, 'listings', fields=['images', 'title']))
         
         updated_count = 0
         
         for doc in docs:
-            data = doc.to_dict()
-            images = data.get('images', [])
-            title = data.get('title', 'No title')
+            images = doc.get('images', [])
+            title = doc.get('title', 'No title')
             
             # Check if any images need fixing
             updated_images = []
@@ -72,7 +47,7 @@ def fix_broken_image_urls():
                     updated_images.append(image_url)
             
             if needs_update:
-                doc.reference.update({'images': updated_images})
+                listings_ref.document(doc.id).update(stamp_updated({'images': updated_images}))
                 updated_count += 1
         
         print(f"\n✅ Fixed {updated_count} listings with broken image URLs")
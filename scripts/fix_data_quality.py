@@ -6,18 +6,16 @@ Fix data quality issues for marketplace listings:
 3. Spread posting dates from January 1, 2025 to June 2, 2025
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+import argparse
 from faker import Faker
 import random
 from datetime import datetime, timezone, timedelta
 
-# Initialize Firebase
-if not firebase_admin._apps:
-    cred = credentials.Certificate('serviceAccountKey.json')
-    firebase_admin.initialize_app(cred)
+from batch_writer import FIRESTORE_BATCH_LIMIT, commit_in_batches, print_write_stats
+from firestore_client import get_db
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments, scan_collection
+from progress import DEFAULT_INTERVAL, ProgressReporter, add_progress_arguments
 
-db = firestore.client()
 fake = Faker()
 
 # Define diverse US locations
@@ -123,70 +121,106 @@ def generate_random_date():
     
     return random_date
 
-def fix_listing_data():
-    """Fix data quality issues for all fake listings"""
+# Listings owned by real users keep their original data
+REAL_USER_IDS = {
+    'YfY4GhBz5eeMC85ULOPhRH6eeKa2',
+    'Rn67vCW8n6TGgkI0Bt4KdLs83bO2',
+    'EqXqL9H4SZS9XGGsKDhxLVbLNKV2',
+    'KqXqL9H4SZS9XGGsKDhxLVbLN123'
+}
+
+# Fields read to decide on fixes; the sweep transfers nothing else
+FIXED_FIELDS = ['userId', 'contactEmail', 'location', 'datePosted']
+
+def plan_listing_updates(listing_data, user_id):
+    """Return the field updates needed to fix one fake listing (empty when it is clean)"""
+    updates = {}
     
-    print("🔍 Fetching all listings...")
-    listings_ref = db.collection('listings')
-    listings = listings_ref.stream()
+    # Fix contact email
+    if listing_data.get('contactEmail') is None:
+        updates['contactEmail'] = generate_email_from_name(user_id)
     
-    updated_count = 0
+    # Fix location if it's San Francisco, CA
+    if listing_data.get('location', '') == "San Francisco, CA":
+        updates['location'] = random.choice(LOCATIONS)
     
-    for listing in listings:
-        listing_data = listing.to_dict()
-        user_id = listing_data.get('userId', '')
-        
-        # Skip real user listings (preserve original data)
-        real_user_ids = [
-            'YfY4GhBz5eeMC85ULOPhRH6eeKa2',
-            'Rn67vCW8n6TGgkI0Bt4KdLs83bO2', 
-            'EqXqL9H4SZS9XGGsKDhxLVbLNKV2',
-            'KqXqL9H4SZS9XGGsKDhxLVbLN123'
-        ]
-        
-        if user_id in real_user_ids:
-            print(f"⏭️  Skipping real listing: {listing.id}")
-            continue
+    # Fix date posted
+    if listing_data.get('datePosted') is None:
+        # Generate random date and also update createdAt to match
+        new_date = generate_random_date()
+        updates['datePosted'] = new_date
+        updates['createdAt'] = new_date
+        updates['updatedAt'] = new_date
+    
+    return updates
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return repr(value)
+
+def print_planned_diff(listing_id, listing_data, updates):
+    print(f"📝 {listing_id}")
+    for field, new_value in updates.items():
+        print(f"    {field}: {_format_value(listing_data.get(field))} → {_format_value(new_value)}")
+
+def fix_listing_data(dry_run=False, batch_size=FIRESTORE_BATCH_LIMIT, workers=4, page_size=DEFAULT_PAGE_SIZE,
+                     quiet=False, progress_interval=DEFAULT_INTERVAL):
+    """
+    Fix data quality issues for all fake listings.
+    Updates are planned while paging through the collection and committed in
+    batches by a small worker pool; with dry_run the planned diff is printed
+    and nothing is written. Progress is reported at most every
+    progress_interval seconds; with quiet only a JSON summary is printed.
+    """
+    
+    db = get_db()
+    listings_ref = db.collection('listings')
+    total = listings_ref.count().get()[0][0].value
+    progress = ProgressReporter("Fixing listings", total=total, unit='listings',
+                                interval=progress_interval, quiet=quiet)
+    progress.log(f"🔍 Scanning {total} listings...")
+    counts = {'scanned': 0, 'skipped': 0, 'planned': 0}
+    
+    def planned_updates():
+        for listing in scan_collection(db, 'listings', fields=FIXED_FIELDS, page_size=page_size):
+            counts['scanned'] += 1
+            listing_data = listing.to_dict()
+            user_id = listing_data.get('userId', '')
             
-        # Prepare updates
-        updates = {}
-        
-        # Fix contact email
-        contact_email = listing_data.get('contactEmail')
-        if contact_email is None:
-            new_email = generate_email_from_name(user_id)
-            updates['contactEmail'] = new_email
-            print(f"📧 Adding email for {user_id}: {new_email}")
-        
-        # Fix location if it's San Francisco, CA
-        current_location = listing_data.get('location', '')
-        if current_location == "San Francisco, CA":
-            new_location = random.choice(LOCATIONS)
-            updates['location'] = new_location
-            print(f"📍 Changing location from {current_location} to {new_location}")
-        
-        # Fix date posted
-        date_posted = listing_data.get('datePosted')
-        if date_posted is None:
-            # Generate random date and also update createdAt to match
-            new_date = generate_random_date()
-            updates['datePosted'] = new_date
-            updates['createdAt'] = new_date
-            updates['updatedAt'] = new_date
-            print(f"📅 Setting date for listing {listing.id}: {new_date.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # Apply updates if any
-        if updates:
-            try:
-                listings_ref.document(listing.id).update(updates)
-                updated_count += 1
-                print(f"✅ Updated listing {listing.id}")
-            except Exception as e:
-                print(f"❌ Error updating listing {listing.id}: {e}")
-        else:
-            print(f"⏭️  No updates needed for listing {listing.id}")
-    
-    print(f"\n🎉 Data quality fix complete! Updated {updated_count} listings.")
+            # Skip real user listings (preserve original data)
+            if user_id in REAL_USER_IDS:
+                counts['skipped'] += 1
+                progress.update(skipped=1)
+                continue
+            
+            updates = plan_listing_updates(listing_data, user_id)
+            progress.update()
+            if updates:
+                counts['planned'] += 1
+                yield listing.id, listing_data, updates
+    
+    if dry_run:
+        for listing_id, listing_data, updates in planned_updates():
+            if not quiet:
+                print_planned_diff(listing_id, listing_data, updates)
+        progress.log(f"\n🧪 Dry run: {counts['planned']} of {counts['scanned']} listings would be updated "
+                     f"({counts['skipped']} real listings skipped). Nothing was written.")
+        progress.finish(dry_run=True, **counts)
+        return counts
+    
+    operations = (('update', listings_ref.document(listing_id), updates)
+                  for listing_id, _, updates in planned_updates())
+    
+    stats = commit_in_batches(db, operations, batch_size=batch_size, max_workers=workers)
+    if not quiet:
+        print_write_stats(stats, label="listings")
+    updated_count = stats['written']
+    
+    progress.log(f"\n🎉 Data quality fix complete! Updated {updated_count} listings.")
+    progress.finish(written=updated_count, failed=stats['failed'], retries=stats['retries'], **counts)
+    if quiet:
+        return stats
     
     # Verify changes
     print("\n🔍 Verifying changes...")
@@ -197,7 +231,7 @@ def fix_listing_data():
         user_id = data.get('userId', 'unknown')
         
         # Skip real users in verification
-        if user_id in ['YfY4GhBz5eeMC85ULOPhRH6eeKa2', 'Rn67vCW8n6TGgkI0Bt4KdLs83bO2', 'EqXqL9H4SZS9XGGsKDhxLVbLNKV2', 'KqXqL9H4SZS9XGGsKDhxLVbLN123']:
+        if user_id in REAL_USER_IDS:
             continue
             
         print(f"\n📄 Sample listing {listing.id}:")
@@ -206,6 +240,17 @@ def fix_listing_data():
         print(f"  📍 Location: {data.get('location', 'None')}")
         print(f"  📅 Date Posted: {data.get('datePosted', 'None')}")
         break
+    
+    return stats
 
 if __name__ == "__main__":
-    fix_listing_data()
+    parser = argparse.ArgumentParser(description="Fix emails, locations and posting dates of fake listings")
+    parser.add_argument('--dry-run', action='store_true', help="print the planned changes without writing")
+    parser.add_argument('--batch-size', type=int, default=FIRESTORE_BATCH_LIMIT,
+                        help=f"writes per batch commit (max {FIRESTORE_BATCH_LIMIT})")
+    parser.add_argument('--workers', type=int, default=4, help="batches committed concurrently")
+    add_scan_arguments(parser)
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+    fix_listing_data(dry_run=args.dry_run, batch_size=args.batch_size, workers=args.workers,
+                     page_size=args.page_size, quiet=args.quiet, progress_interval=args.progress_interval)
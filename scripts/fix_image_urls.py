@@ -3,32 +3,8 @@
 Fix image URLs for fake listings by replacing Firebase Storage URLs with working placeholder images.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase, stamp_updated
+from listing_record import scan_records
 
 def get_placeholder_url(category):
     """Get a working placeholder image URL based on category"""
@@ -49,7 +25,7 @@ def fix_image_urls():
     try:
         # Get all listings
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        docs = list(scan_records(db, 'listings', fields=['images', 'category']))
         
         # Real listing IDs to preserve (these have working images)
         real_listing_ids = [
@@ -67,19 +43,15 @@ def fix_image_urls():
                 print(f"⏭️  Skipping real listing: {doc.id}")
                 continue
                 
-            data = doc.to_dict()
-            images = data.get('images', [])
-            category = data.get('category', '')
+            images = doc.get('images', [])
+            category = doc.get('category', '')
             
             # Check if this has Firebase Storage URLs that are failing
             if images and any('firebasestorage.googleapis.com' in img for img in images):
                 new_url = get_placeholder_url(category)
                 
                 # Update the document with new placeholder image
-                doc.reference.update({
-                    'images': [new_url]
-                })
-                
+                listings_ref.document(doc.id).update(stamp_updated({'images': [new_url]}))
                 print(f"✅ Updated listing {doc.id} ({category}) - new image URL: {new_url}")
                 updated_count += 1
         
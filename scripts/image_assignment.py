@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Optimal listing-to-image assignment.
+Solves the uniqueness-constrained matching (each image used at most once)
+for the maximum total match score instead of assigning greedily.
+Requires: pip install numpy scipy
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix, diags, hstack, issparse
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+# Above this many listing x image cells the dense solver is not worth the memory
+SPARSE_CELL_THRESHOLD = 1_000_000
+
+
+def _solve_dense(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return linear_sum_assignment(scores, maximize=True)
+
+
+def _solve_sparse(scores: csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve on a sparse matrix with min-cost full bipartite matching.
+
+    Each listing gets a private "unassigned" column so a full matching always
+    exists; real edges cost (max + 1 - score) and the dummy costs (max + 1), so
+    minimizing total cost maximizes total score. All costs stay strictly
+    positive so no edge is mistaken for a missing one.
+    """
+    n_listings, n_images = scores.shape
+    ceiling = (scores.max() if scores.nnz else 0.0) + 1.0
+
+    real = scores.tocsr(copy=True)
+    real.data = ceiling - real.data
+    unassigned = diags(np.full(n_listings, ceiling), format='csr')
+    costs = hstack([real, unassigned], format='csr')
+
+    row_ind, col_ind = min_weight_full_bipartite_matching(costs)
+    matched = col_ind < n_images
+    return row_ind[matched], col_ind[matched]
+
+
+def solve_assignment(scores, sparse: bool = None) -> List[Tuple[int, int, float]]:
+    """
+    Return (listing_index, image_index, score) for the assignment maximizing the
+    total score, with every image used at most once. Pairs scoring zero are
+    dropped, so listings without a real match stay unassigned.
+    """
+    if sparse is None:
+        sparse = issparse(scores)
+
+    if sparse:
+        scores = csr_matrix(scores)
+        if scores.nnz == 0:
+            return []
+        row_ind, col_ind = _solve_sparse(scores)
+        values = np.asarray(scores[row_ind, col_ind]).ravel()
+    else:
+        scores = scores.toarray() if issparse(scores) else np.asarray(scores, dtype=np.float64)
+        if scores.size == 0:
+            return []
+        row_ind, col_ind = _solve_dense(scores)
+        values = scores[row_ind, col_ind]
+
+    return [
+        (int(row), int(col), float(value))
+        for row, col, value in zip(row_ind, col_ind, values)
+        if value > 0
+    ]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern keyword matching using an Aho-Corasick automaton.
+Build once from a keyword table, then find every keyword occurring in a
+text with a single pass over it, independent of the table size.
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed, ordered set of keywords"""
+
+    def __init__(self, keywords):
+        # Insertion order of each keyword, used by callers to break ties
+        self.order = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword in keywords:
+            if keyword in self.order or not keyword:
+                continue
+            self.order[keyword] = len(self.order)
+            self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(keyword)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Inherit matches that end at the fallback state (suffix keywords)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.order)
+
+    def iter_matches(self, text):
+        """Yield (start_index, keyword) for every keyword occurrence in text"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                yield index - len(keyword) + 1, keyword
+
+    def find_all(self, text):
+        """Return the set of keywords that occur anywhere in text"""
+        return {keyword for _, keyword in self.iter_matches(text)}
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Listing checks for the single-pass audit runner (audit_runner.py).
+Each check declares the listing fields it reads and is fed every listing in
+turn, so any script scanning listings can run one alongside its own work.
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+
+from listing_schema import ListingValidator, ValidationReport
+from listing_stats import ListingStatsCounter, print_listing_stats
+from referential_integrity import ReferenceChecker
+
+# Listing ids kept as examples in each check's report
+SAMPLE_LIMIT = 5
+
+
+class ListingCheck(ABC):
+    """
+    One audit over the listings collection. The runner calls add() for every
+    listing with the fields in `fields` (others are not fetched), then
+    finish() once, whose JSON-serializable result print_report() renders.
+    """
+
+    name = None
+    fields = ()
+
+    @abstractmethod
+    def add(self, doc_id, data):
+        """Take one listing into account"""
+
+    @abstractmethod
+    def finish(self):
+        """Return the check's result once every listing has been added"""
+
+    @abstractmethod
+    def print_report(self, result):
+        """Print the result returned by finish()"""
+
+
+class DuplicateImagesCheck(ListingCheck):
+    """Image URLs used by more than one listing"""
+
+    name = 'duplicate-images'
+    fields = ('images',)
+
+    def __init__(self):
+        self.usage = Counter()
+        self.examples = defaultdict(list)
+        self.references = 0
+
+    def add(self, doc_id, data):
+        for url in dict.fromkeys(data.get('images') or ()):
+            if not isinstance(url, str):
+                continue  # reported by the null-fields check
+            self.usage[url] += 1
+            self.references += 1
+            if len(self.examples[url]) < SAMPLE_LIMIT:
+                self.examples[url].append(doc_id)
+
+    def finish(self):
+        duplicates = [(url, count) for url, count in self.usage.most_common() if count > 1]
+        return {
+            'image_references': self.references,
+            'distinct_images': len(self.usage),
+            'duplicated_images': len(duplicates),
+            'duplicates': [{'url': url, 'listings': count, 'examples': self.examples[url]}
+                           for url, count in duplicates],
+        }
+
+    def print_report(self, result):
+        print(f"  {result['distinct_images']} distinct images across {result['image_references']} references, "
+              f"{result['duplicated_images']} used by more than one listing")
+        for duplicate in result['duplicates'][:10]:
+            print(f"    Used {duplicate['listings']} times: {duplicate['url']}")
+
+
+class NullFieldsCheck(ListingCheck):
+    """
+    Missing, null, empty and mistyped fields, checked against each listing's
+    category schema by listing_schema.ListingValidator
+    """
+
+    name = 'null-fields'
+
+    def __init__(self, validator=None):
+        self.validator = validator if validator is not None else ListingValidator()
+        self.fields = tuple(self.validator.fields)
+        self.report = ValidationReport()
+
+    def add(self, doc_id, data):
+        self.validator.add_to_report(self.report, doc_id, data)
+
+    def finish(self):
+        return self.report.to_dict()
+
+    def print_report(self, result):
+        print(f"  {result['invalid']} of {result['validated']} listings with null, empty or mistyped fields")
+        for violation in result['violations'][:10]:
+            print(f"    {violation['category'] or 'other'}.{violation['field']}: {violation['problem']} "
+                  f"× {violation['listings']} (e.g. {', '.join(violation['examples'])})")
+
+
+class OrphanUsersCheck(ListingCheck):
+    """Listings whose userId names no user document"""
+
+    name = 'orphan-users'
+    fields = ('userId',)
+
+    def __init__(self, db=None, snapshot=None):
+        missing_ids = None
+        if snapshot is not None:
+            missing_ids = lambda ids: [user_id for user_id in ids if snapshot.document('users', user_id) is None]
+        self.checker = ReferenceChecker(db, 'users', missing_ids=missing_ids)
+
+    def add(self, doc_id, data):
+        self.checker.add(data.get('userId'))
+
+    def finish(self):
+        return self.checker.finish()
+
+    def print_report(self, result):
+        print(f"  {result['distinct']} distinct users referenced, {result['unreferenced']} listings without a userId")
+        if result['orphans']:
+            print(f"  ❌ {len(result['orphans'])} missing users: {', '.join(result['orphans'][:20])}")
+        else:
+            print("  ✅ All listing user references are valid")
+
+
+class CategoryStatsCheck(ListingCheck):
+    """Listing counts and prices per category, and counts per status"""
+
+    name = 'categories'
+    fields = ('category', 'price', 'status', 'isActive')
+
+    def __init__(self):
+        self.counter = ListingStatsCounter()
+
+    def add(self, doc_id, data):
+        self.counter.add(data)
+
+    def finish(self):
+        return self.counter.result()
+
+    def print_report(self, result):
+        print_listing_stats(result)
+
+
+class ImageTokenCheck(ListingCheck):
+    """Firebase Storage image URLs without a download token, which the app cannot load"""
+
+    name = 'image-tokens'
+    fields = ('images',)
+
+    def __init__(self):
+        self.storage_urls = 0
+        self.missing = 0
+        self.examples = []
+
+    def add(self, doc_id, data):
+        for url in data.get('images') or ():
+            if isinstance(url, str) and 'firebasestorage.googleapis.com' in url:
+                self.storage_urls += 1
+                if 'token=' not in url:
+                    self.missing += 1
+                    if len(self.examples) < SAMPLE_LIMIT:
+                        self.examples.append(doc_id)
+
+    def finish(self):
+        return {'storage_urls': self.storage_urls, 'missing_token': self.missing, 'examples': self.examples}
+
+    def print_report(self, result):
+        print(f"  {result['storage_urls']} Firebase Storage image URLs, {result['missing_token']} without a token")
+        if result['examples']:
+            print(f"    e.g. {', '.join(result['examples'])}")
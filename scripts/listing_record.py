@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory representation of listing documents.
+Scripts that hold a whole collection keep ListingRecords instead of document
+snapshots or per-document dicts: the common listing fields live in slots, the
+few uncommon ones in a small side dict, and strings that repeat across
+listings (category, location, status, userId, image URLs) are interned so
+each distinct value is stored once.
+Requires: pip install firebase-admin
+"""
+
+import sys
+
+from firestore_scan import DEFAULT_PAGE_SIZE
+from listings_snapshot import scan_source
+
+# Fields of lib/models/listing.dart and the seed scripts; anything else goes to `extra`
+LISTING_FIELDS = (
+    'title',
+    'description',
+    'category',
+    'location',
+    'status',
+    'condition',
+    'userId',
+    'sellerId',
+    'sellerName',
+    'price',
+    'images',
+    'isActive',
+    'featured',
+    'contactEmail',
+    'contactPhone',
+    'categoryFields',
+    'datePosted',
+    'createdAt',
+    'updatedAt',
+)
+_SLOTTED = frozenset(LISTING_FIELDS)
+
+# Low-cardinality strings shared by many listings
+INTERNED_FIELDS = frozenset(('category', 'location', 'status', 'condition', 'userId'))
+
+# Category-specific attributes (make, fuelType, gender, ...) come from small
+# vocabularies, so short string values in `extra` are interned as well
+MAX_INTERNED_EXTRA_LENGTH = 64
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class ListingRecord:
+    """
+    Read-only listing with the DocumentSnapshot methods scripts use (id,
+    to_dict, get). An unset slot means the field is absent from the document.
+    images is stored as a tuple of interned URLs.
+    """
+
+    __slots__ = ('id', 'extra') + LISTING_FIELDS
+
+    exists = True
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        extra = None
+        for field, value in data.items():
+            if field not in _SLOTTED:
+                if extra is None:
+                    extra = {}
+                if type(value) is str and len(value) <= MAX_INTERNED_EXTRA_LENGTH:
+                    value = sys.intern(value)
+                extra[sys.intern(field)] = value
+            elif field in INTERNED_FIELDS:
+                setattr(self, field, _intern(value))
+            elif field == 'images' and isinstance(value, list):
+                setattr(self, field, tuple(_intern(url) for url in value))
+            else:
+                setattr(self, field, value)
+        self.extra = extra
+
+    @classmethod
+    def from_snapshot(cls, doc):
+        return cls(doc.id, doc.to_dict() or {})
+
+    def get(self, field, default=None):
+        if field in _SLOTTED:
+            return getattr(self, field, default)
+        return self.extra.get(field, default) if self.extra else default
+
+    def to_dict(self):
+        data = {}
+        for field in LISTING_FIELDS:
+            try:
+                data[field] = getattr(self, field)
+            except AttributeError:
+                continue
+        if isinstance(data.get('images'), tuple):
+            data['images'] = list(data['images'])
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"ListingRecord({self.id!r}, title={self.get('title')!r})"
+
+
+def scan_records(db, collection='listings', fields=None, page_size=DEFAULT_PAGE_SIZE, snapshot=None):
+    """Like listings_snapshot.scan_source, but yielding ListingRecords"""
+    for doc in scan_source(db, collection, fields=fields, page_size=page_size, snapshot=snapshot):
+        yield ListingRecord.from_snapshot(doc)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Per-category listing schemas and compiled validators.
+The schemas are derived from the documents seed_with_tokens.py writes for
+each category, so they follow the seed data as it changes. Each schema is
+compiled once into a validator function over precomputed field checks, and
+whole collections (or snapshots) are validated in bulk into a compact report
+of violation counts with a few example listing ids each.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime
+
+# Real (non-seeded) listings that cleanup preserves and the seed-data checks skip
+KEEP_LISTINGS = [
+    'eJcyzgfMmfM2eLEmeK62',
+    'qBK9kYmhiYiom99DkluB',
+    'sNzIfzKXAkpySLNVnUCC',
+    'tdDUoLaNAozUyTriLX3r'
+]
+
+# Listing ids kept as examples per violation
+EXAMPLE_LIMIT = 3
+
+# Fields Listing.fromJson (lib/models/listing.dart) hard-casts, so a null fails to parse;
+# datePosted and contactEmail fall back to createdAt and a placeholder instead
+REQUIRED_FIELDS = ('title', 'description', 'price', 'category', 'userId', 'location')
+
+# The app writes prices as doubles while the seed scripts write ints
+NUMBER = (int, float)
+
+_MISSING = object()
+
+
+class FieldSpec:
+    """Accepted types of a field, whether it must be present, and the type of list items"""
+
+    __slots__ = ('types', 'required', 'item_types')
+
+    def __init__(self, types, required=True, item_types=None):
+        self.types = types if isinstance(types, tuple) else (types,)
+        self.required = required
+        self.item_types = item_types
+
+    def __repr__(self):
+        names = '|'.join(t.__name__ for t in self.types)
+        items = f"[{'|'.join(t.__name__ for t in self.item_types)}]" if self.item_types else ''
+        return f"{names}{items}{'' if self.required else '?'}"
+
+
+def _spec_for(values):
+    """Widest FieldSpec accepting every sample value of a field"""
+    types = set()
+    item_types = set()
+    for value in values:
+        if isinstance(value, bool):
+            types.add(bool)
+        elif isinstance(value, (int, float)):
+            types.update(NUMBER)
+        elif isinstance(value, datetime):
+            types.add(datetime)
+        elif isinstance(value, list):
+            types.add(list)
+            item_types.update(type(item) for item in value)
+        else:
+            types.add(type(value))
+    return FieldSpec(tuple(sorted(types, key=lambda t: t.__name__)),
+                     item_types=tuple(item_types) if item_types else None)
+
+
+def derive_schema(samples, optional=()):
+    """Schema of fields present in every sample document; fields in `optional` may be absent"""
+    samples = list(samples)
+    fields = set.intersection(*(set(sample) for sample in samples)) if samples else set()
+    schema = {field: _spec_for(sample[field] for sample in samples) for field in sorted(fields)}
+    for field in optional:
+        if field in schema:
+            schema[field].required = False
+    return schema
+
+
+def derive_category_schemas():
+    """
+    {category: schema} for every category the seed script writes, plus the
+    fields all of them share under the None key for other categories. Only
+    REQUIRED_FIELDS must be present; the other fields the seed script writes
+    (views, status, updatedAt, ...) are type-checked when present.
+    """
+    # Imported here so validator users only load the seed script when deriving schemas
+    from seed_with_tokens import CATEGORY_FACTORIES, build_listing_data
+
+    samples = {
+        category: [build_listing_data(listing, category, 'user') for listing in factory()]
+        for category, factory in CATEGORY_FACTORIES.items()
+    }
+    optional = {field for docs in samples.values() for doc in docs for field in doc} - set(REQUIRED_FIELDS)
+    schemas = {category: derive_schema(docs, optional) for category, docs in samples.items()}
+    common = set.intersection(*(set(schema) for schema in schemas.values()))
+    schemas[None] = {field: spec for field, spec in schemas[next(iter(schemas))].items() if field in common}
+    return schemas
+
+
+def compile_validator(schema):
+    """
+    Compile a schema into validate(data) -> list of (field, problem) pairs,
+    empty when the document conforms. Problems are 'missing', 'null',
+    'empty', 'null item' and 'type <name>'.
+    """
+    checks = tuple(
+        (field, spec.types, spec.required, spec.item_types, bool not in spec.types, str in spec.types)
+        for field, spec in schema.items()
+    )
+
+    def validate(data):
+        violations = []
+        for field, types, required, item_types, reject_bool, is_text in checks:
+            value = data.get(field, _MISSING)
+            if value is _MISSING:
+                if required:
+                    violations.append((field, 'missing'))
+            elif value is None:
+                violations.append((field, 'null'))
+            elif not isinstance(value, types) or (reject_bool and type(value) is bool):
+                violations.append((field, f"type {type(value).__name__}"))
+            elif is_text and value == "":
+                violations.append((field, 'empty'))
+            elif item_types is not None:
+                if not value:
+                    violations.append((field, 'empty'))
+                elif any(item is None for item in value):
+                    violations.append((field, 'null item'))
+        return violations
+
+    return validate
+
+
+class ValidationReport:
+    """Violation counts per (category, field, problem) with example listing ids"""
+
+    def __init__(self):
+        self.validated = 0
+        self.invalid = 0
+        self.counts = Counter()
+        self.examples = defaultdict(list)
+
+    def add(self, doc_id, category, violations):
+        self.validated += 1
+        if not violations:
+            return
+        self.invalid += 1
+        for field, problem in violations:
+            key = (category, field, problem)
+            self.counts[key] += 1
+            if len(self.examples[key]) < EXAMPLE_LIMIT:
+                self.examples[key].append(doc_id)
+
+    def to_dict(self):
+        return {
+            'validated': self.validated,
+            'invalid': self.invalid,
+            'violations': [
+                {'category': category, 'field': field, 'problem': problem, 'listings': count,
+                 'examples': self.examples[(category, field, problem)]}
+                for (category, field, problem), count in self.counts.most_common()
+            ],
+        }
+
+    def print_report(self, limit=30):
+        print(f"🧪 Validated {self.validated} listings: {self.invalid} with schema violations")
+        for (category, field, problem), count in self.counts.most_common(limit):
+            examples = ', '.join(self.examples[(category, field, problem)])
+            print(f"  {category or 'other'}.{field}: {problem} × {count} (e.g. {examples})")
+        if len(self.counts) > limit:
+            print(f"  ... and {len(self.counts) - limit} more kinds of violation")
+
+
+class ListingValidator:
+    """Validators for every category schema, compiled once and reused across documents"""
+
+    def __init__(self, schemas=None):
+        schemas = schemas if schemas is not None else derive_category_schemas()
+        self.schemas = schemas
+        self.validators = {category: compile_validator(schema) for category, schema in schemas.items()}
+        self.fallback = self.validators[None]
+
+    @property
+    def fields(self):
+        """Every field some schema checks, i.e. the projection a validating scan needs"""
+        return sorted({field for schema in self.schemas.values() for field in schema})
+
+    def validate(self, data):
+        return self.validators.get(data.get('category'), self.fallback)(data)
+
+    def add_to_report(self, report, doc_id, data):
+        """Validate one document's data into `report`, under None when its category has no schema"""
+        category = data.get('category')
+        validate = self.validators.get(category, self.fallback)
+        report.add(doc_id, category if validate is not self.fallback else None, validate(data))
+
+    def validate_documents(self, docs, skip_ids=(), report=None):
+        """Validate document snapshots (or ListingRecords) into a ValidationReport"""
+        report = report if report is not None else ValidationReport()
+        for doc in docs:
+            if doc.id not in skip_ids:
+                self.add_to_report(report, doc.id, doc.to_dict())
+        return report
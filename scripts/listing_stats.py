@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Per-category and per-status listing statistics.
+Online, each figure is a Firestore aggregation query (count, sum and avg of
+price) run concurrently, so a summary costs a few aggregation reads rather
+than one read per listing. Listings in any other category are counted by
+name from a scan projected on `category`, which only runs when there are
+any. The same figures can be computed from any iterable of documents, e.g.
+the local snapshot.
+Requires: pip install firebase-admin
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from firestore_scan import scan_collection
+
+# Mirrors Categories.all in lib/models/category.dart
+CATEGORY_IDS = [
+    'vehicles',
+    'property-rentals',
+    'apparel',
+    'classifieds',
+    'electronics',
+    'entertainment',
+    'family',
+    'free-stuff',
+    'garden-outdoor',
+    'hobbies',
+    'home-goods',
+    'home-improvement',
+    'home-sales',
+    'musical-instruments',
+    'office-supplies',
+    'pet-supplies',
+    'sporting-goods',
+    'toys-games',
+]
+
+# Label for listings without a category field
+UNKNOWN_CATEGORY = 'unknown'
+
+# Seed scripts write `status`, the app writes `isActive`
+STATUS_FILTERS = {
+    'status = active': ('status', '==', 'active'),
+    'isActive = false': ('isActive', '==', False),
+}
+
+
+def _aggregate(query, with_price=True):
+    """Run one aggregation query and return {'count', 'total_price', 'average_price'}"""
+    aggregation = query.count(alias='count')
+    if with_price:
+        aggregation = aggregation.sum('price', alias='total_price').avg('price', alias='average_price')
+    results = {result.alias: result.value for result in aggregation.get()[0]}
+    return {
+        'count': int(results['count']),
+        'total_price': results.get('total_price'),
+        'average_price': results.get('average_price'),
+    }
+
+
+def aggregate_listing_stats(db, categories=CATEGORY_IDS, statuses=STATUS_FILTERS, max_workers=8):
+    """
+    Compute listing statistics with aggregation queries.
+    Returns {'total': n, 'categories': {id: stats}, 'statuses': {label: count},
+    'other_categories': {category: count}}, where stats holds count,
+    total_price and average_price and other_categories counts the listings
+    outside `categories`, most frequent first.
+    """
+    # Imported here so offline use never loads the Firestore client
+    from google.cloud.firestore import FieldFilter
+
+    listings_ref = db.collection('listings')
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        total = executor.submit(_aggregate, listings_ref, False)
+        by_category = {
+            category: executor.submit(
+                _aggregate, listings_ref.where(filter=FieldFilter('category', '==', category)))
+            for category in categories
+        }
+        by_status = {
+            label: executor.submit(_aggregate, listings_ref.where(filter=FieldFilter(*condition)), False)
+            for label, condition in statuses.items()
+        }
+        stats = {
+            'total': total.result()['count'],
+            'categories': {category: future.result() for category, future in by_category.items()},
+            'statuses': {label: future.result()['count'] for label, future in by_status.items()},
+        }
+
+    stats['other_categories'] = {}
+    if stats['total'] > sum(s['count'] for s in stats['categories'].values()):
+        # Aggregations cannot group, so name the remaining categories from a category-only scan
+        known = set(categories)
+        others = Counter(
+            category for category in (doc.to_dict().get('category', UNKNOWN_CATEGORY)
+                                      for doc in scan_collection(db, 'listings', fields=['category']))
+            if category not in known)
+        stats['other_categories'] = dict(others.most_common())
+    return stats
+
+
+class ListingStatsCounter:
+    """Accumulates the statistics of compute_listing_stats one listing at a time"""
+
+    def __init__(self, categories=CATEGORY_IDS, statuses=STATUS_FILTERS):
+        self.statuses = statuses
+        self.stats = {category: {'count': 0, 'total_price': 0, 'prices': 0} for category in categories}
+        self.status_counts = dict.fromkeys(statuses, 0)
+        self.others = Counter()
+        self.total = 0
+
+    def add(self, data):
+        self.total += 1
+        category = data.get('category', UNKNOWN_CATEGORY)
+        category_stats = self.stats.get(category)
+        if category_stats is None:
+            self.others[category] += 1
+        else:
+            category_stats['count'] += 1
+            price = data.get('price')
+            # Aggregations ignore non-numeric values, so do the same here
+            if isinstance(price, (int, float)) and not isinstance(price, bool):
+                category_stats['total_price'] += price
+                category_stats['prices'] += 1
+        for label, (field, _, value) in self.statuses.items():
+            if data.get(field) == value:
+                self.status_counts[label] += 1
+
+    def result(self):
+        return {
+            'total': self.total,
+            'categories': {
+                category: {
+                    'count': s['count'],
+                    'total_price': s['total_price'],
+                    'average_price': s['total_price'] / s['prices'] if s['prices'] else None,
+                }
+                for category, s in self.stats.items()
+            },
+            'statuses': dict(self.status_counts),
+            'other_categories': dict(self.others.most_common()),
+        }
+
+
+def compute_listing_stats(docs, categories=CATEGORY_IDS, statuses=STATUS_FILTERS):
+    """Compute the same statistics as aggregate_listing_stats from documents already at hand"""
+    counter = ListingStatsCounter(categories, statuses)
+    for doc in docs:
+        counter.add(doc.to_dict())
+    return counter.result()
+
+
+def print_listing_stats(stats):
+    print(f"📊 Total listings: {stats['total']}")
+    print("\n📈 Listings by category:")
+    categorized = 0
+    for category, s in stats['categories'].items():
+        if not s['count']:
+            continue
+        categorized += s['count']
+        average = f"${s['average_price']:,.2f}" if s['average_price'] is not None else "n/a"
+        print(f"  {category}: {s['count']} (total ${s['total_price'] or 0:,.0f}, avg {average})")
+    for category, count in stats.get('other_categories', {}).items():
+        categorized += count
+        print(f"  {category} (not an app category): {count}")
+    if stats['total'] > categorized:
+        print(f"  other/unknown: {stats['total'] - categorized}")
+
+    print("\n🚦 Listings by status:")
+    for label, count in stats['statuses'].items():
+        print(f"  {label}: {count}")
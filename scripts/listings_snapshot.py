@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local snapshot of the listings and users collections, backed by SQLite.
+The first sync copies each collection; later syncs only fetch listings whose
+updatedAt is at or after the last watermark, and reconcile creations or
+deletions that carry no updatedAt bump by comparing a count() aggregation and,
+only when the counts disagree, an ids-only scan. Read-only tools can then run
+offline against the snapshot instead of re-downloading every document.
+
+The fixers stamp updatedAt with the server time on every listing they write
+(firestore_client.stamp_updated). Writes from anywhere else that change a
+listing without touching updatedAt are invisible to the delta, as are an
+untracked creation and deletion that cancel out in the count; run with --full
+to resync everything.
+
+Usage:
+  python listings_snapshot.py           # incremental sync
+  python listings_snapshot.py --full    # drop and re-download everything
+Requires: pip install firebase-admin
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from itertools import islice
+
+from firestore_scan import DEFAULT_PAGE_SIZE, add_scan_arguments, scan_collection
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'snapshot.sqlite')
+
+# Collection -> timestamp field used as the incremental sync watermark.
+# Collections without one are copied in full on every sync.
+SNAPSHOT_COLLECTIONS = {
+    'listings': 'updatedAt',
+    'users': None,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+def encode_document(data):
+    """Serialize document data to JSON, keeping datetimes round-trippable"""
+    return json.dumps(data, default=_encode_value, ensure_ascii=False, sort_keys=True)
+
+
+def decode_document(text):
+    return json.loads(text, object_hook=_decode_object)
+
+
+class SnapshotDocument:
+    """Read-only stand-in for a Firestore DocumentSnapshot served from the local snapshot"""
+
+    __slots__ = ('id', '_data')
+
+    exists = True
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+class ListingsSnapshot:
+    """SQLite copy of selected collections with watermark-based incremental sync"""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def _upsert(self, collection, docs):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+            ((collection, doc.id, encode_document(doc.to_dict())) for doc in docs))
+
+    def _set_watermark(self, collection, watermark):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+            (collection, watermark.isoformat() if watermark else None, time.time()))
+
+    def watermark(self, collection):
+        row = self._conn.execute("SELECT watermark FROM sync_state WHERE collection = ?", (collection,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def last_synced(self, collection):
+        row = self._conn.execute("SELECT synced_at FROM sync_state WHERE collection = ?", (collection,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, db, collections=None, full=False, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Bring the snapshot up to date and return {collection: stats}.
+        Each collection is synced in one SQLite transaction, so an interrupted
+        sync leaves the previous snapshot intact.
+        """
+        collections = SNAPSHOT_COLLECTIONS if collections is None else collections
+        return {
+            collection: self._sync_collection(db, collection, watermark_field, full, page_size)
+            for collection, watermark_field in collections.items()
+        }
+
+    def _sync_collection(self, db, collection, watermark_field, full, page_size):
+        previous = None if full or not watermark_field else self.watermark(collection)
+        incremental = previous is not None
+        stats = {'mode': 'incremental' if incremental else 'full', 'fetched': 0, 'added': 0, 'deleted': 0}
+
+        if incremental:
+            # Imported here so offline runs never load the Firestore client
+            from google.cloud.firestore import FieldFilter
+            query = db.collection(collection).where(filter=FieldFilter(watermark_field, '>=', previous))
+            docs = scan_collection(db, collection, page_size=page_size, query=query, order_by=watermark_field)
+        else:
+            docs = scan_collection(db, collection, page_size=page_size)
+
+        watermark = previous
+        with self._conn:
+            if not incremental:
+                self._conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+            while True:
+                page = list(islice(docs, page_size))
+                if not page:
+                    break
+                self._upsert(collection, page)
+                stats['fetched'] += len(page)
+                if watermark_field:
+                    # DocumentSnapshot.get raises for absent fields, to_dict() does not
+                    stamps = [doc.to_dict().get(watermark_field) for doc in page]
+                    stamps = [s for s in stamps if isinstance(s, datetime)]
+                    if stamps and (watermark is None or max(stamps) > watermark):
+                        watermark = max(stamps)
+
+            if incremental:
+                stats['added'], stats['deleted'] = self._reconcile(db, collection, page_size)
+            self._set_watermark(collection, watermark)
+        return stats
+
+    def _reconcile(self, db, collection, page_size):
+        """Pick up creations and deletions the watermark query cannot see"""
+        remote_count = db.collection(collection).count().get()[0][0].value
+        if remote_count == self.count(collection):
+            return 0, 0
+
+        remote_ids = {doc.id for doc in scan_collection(db, collection, fields=[], page_size=page_size)}
+        local_ids = {row[0] for row in self._conn.execute(
+            "SELECT id FROM documents WHERE collection = ?", (collection,))}
+
+        deleted = local_ids - remote_ids
+        self._conn.executemany("DELETE FROM documents WHERE collection = ? AND id = ?",
+                               ((collection, doc_id) for doc_id in deleted))
+
+        missing = sorted(remote_ids - local_ids)
+        col_ref = db.collection(collection)
+        for i in range(0, len(missing), page_size):
+            refs = [col_ref.document(doc_id) for doc_id in missing[i:i + page_size]]
+            self._upsert(collection, (doc for doc in db.get_all(refs) if doc.exists))
+        return len(missing), len(deleted)
+
+    def count(self, collection):
+        return self._conn.execute("SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)).fetchone()[0]
+
+    def scan(self, collection, fields=None):
+        """Yield SnapshotDocuments ordered by id, optionally keeping only `fields`"""
+        rows = self._conn.execute("SELECT id, data FROM documents WHERE collection = ? ORDER BY id", (collection,))
+        for doc_id, text in rows:
+            data = decode_document(text)
+            if fields is not None:
+                data = {field: data[field] for field in fields if field in data}
+            yield SnapshotDocument(doc_id, data)
+
+    def document(self, collection, doc_id):
+        """Return one SnapshotDocument, or None when it is not in the snapshot"""
+        row = self._conn.execute("SELECT data FROM documents WHERE collection = ? AND id = ?",
+                                 (collection, doc_id)).fetchone()
+        return SnapshotDocument(doc_id, decode_document(row[0])) if row else None
+
+
+def scan_source(db, collection, fields=None, page_size=DEFAULT_PAGE_SIZE, snapshot=None):
+    """Scan `collection` from the local snapshot when one is given, otherwise from Firestore"""
+    if snapshot is not None:
+        return snapshot.scan(collection, fields=fields)
+    return scan_collection(db, collection, fields=fields, page_size=page_size)
+
+
+def print_sync_stats(stats):
+    for collection, s in stats.items():
+        print(f"🔄 {collection}: {s['mode']} sync, {s['fetched']} fetched, "
+              f"{s['added']} added, {s['deleted']} removed")
+
+
+def add_snapshot_arguments(parser):
+    """Add the shared --offline/--sync options to an argparse parser"""
+    parser.add_argument('--offline', action='store_true',
+                        help="read from the local snapshot without contacting Firestore")
+    parser.add_argument('--sync', action='store_true',
+                        help="incrementally refresh the local snapshot, then read from it")
+    parser.add_argument('--snapshot-path', default=DEFAULT_SNAPSHOT_PATH,
+                        help="location of the local snapshot database")
+
+
+def snapshot_from_args(args):
+    """Open the snapshot selected by add_snapshot_arguments, or None to read Firestore directly"""
+    if not (args.offline or args.sync):
+        return None
+    if args.offline and not os.path.exists(args.snapshot_path):
+        raise FileNotFoundError(f"No snapshot at {args.snapshot_path}; run listings_snapshot.py first")
+    snapshot = ListingsSnapshot(args.snapshot_path)
+    if args.sync:
+        from firestore_client import get_db
+        print_sync_stats(snapshot.sync(get_db(), page_size=getattr(args, 'page_size', DEFAULT_PAGE_SIZE)))
+    return snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the local snapshot of listings and users")
+    parser.add_argument('--full', action='store_true', help="discard the snapshot and download everything")
+    parser.add_argument('--snapshot-path', default=DEFAULT_SNAPSHOT_PATH)
+    add_scan_arguments(parser)
+    args = parser.parse_args()
+
+    from firestore_client import get_db
+
+    with ListingsSnapshot(args.snapshot_path) as snapshot:
+        start = time.time()
+        stats = snapshot.sync(get_db(), full=args.full, page_size=args.page_size)
+        print_sync_stats(stats)
+        for collection in stats:
+            print(f"📦 {collection}: {snapshot.count(collection)} documents in snapshot")
+        print(f"✅ Snapshot synced in {time.time() - start:.1f}s")
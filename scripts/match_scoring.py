@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Vectorized listing-to-image match scoring.
+Encodes listings as sparse feature-incidence rows and images as weight
+columns, so the whole score matrix is one sparse matrix product. Produces
+the same scores as perfect_image_matching.calculate_match_score.
+Requires: pip install numpy scipy
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+from image_assignment import SPARSE_CELL_THRESHOLD
+from keyword_matcher import KeywordMatcher
+
+# Weights from calculate_match_score
+KEYWORD_PARTIAL_WEIGHT = 50
+KEYWORD_EXACT_WEIGHT = 100
+BRAND_WEIGHT = 150
+CATEGORY_WEIGHT = 25
+TYPE_WEIGHT = 75
+
+
+class ImageFeatureModel:
+    """
+    Feature vocabulary and weight matrix for an image database.
+
+    Every pattern the scorer looks for (keywords, brands, categories, types)
+    is a feature. Columns 0..F-1 of a listing row mean "pattern occurs as a
+    substring", columns F..2F-1 mean "pattern occurs as a whole phrase".
+    """
+
+    def __init__(self, image_db: Dict[str, Dict]):
+        self.image_ids = list(image_db)
+        features = {}
+        weights = []  # (feature_row, image_col, weight) triplets
+
+        def feature(pattern):
+            return features.setdefault(pattern, len(features))
+
+        for col, img_data in enumerate(image_db.values()):
+            for keyword in img_data["keywords"]:
+                weights.append((feature(keyword.lower()), col, KEYWORD_PARTIAL_WEIGHT, False))
+                # A whole-phrase match earns the difference up to the exact weight
+                weights.append((feature(keyword.lower()), col, KEYWORD_EXACT_WEIGHT - KEYWORD_PARTIAL_WEIGHT, True))
+            if "brand" in img_data and img_data["brand"].lower() != "generic":
+                weights.append((feature(img_data["brand"].lower()), col, BRAND_WEIGHT, False))
+            # Category is matched case-sensitively against lowercased text, as in the original scorer
+            weights.append((feature(img_data["category"]), col, CATEGORY_WEIGHT, False))
+            if "type" in img_data:
+                weights.append((feature(img_data["type"].lower()), col, TYPE_WEIGHT, False))
+
+        self.features = features
+        self.matcher = KeywordMatcher(features)
+        n_features = len(features)
+        rows = [row + (n_features if exact else 0) for row, _, _, exact in weights]
+        cols = [col for _, col, _, _ in weights]
+        data = [weight for _, _, weight, _ in weights]
+        # Duplicate (row, col) entries are summed, matching repeated keywords in the original
+        self.weights = csr_matrix((np.asarray(data, dtype=np.float64), (rows, cols)),
+                                  shape=(2 * n_features, len(self.image_ids)))
+
+    def encode(self, texts: Sequence[str]) -> csr_matrix:
+        """Encode listing texts as a sparse (listings x 2F) incidence matrix"""
+        n_features = len(self.features)
+        indptr = [0]
+        indices = []
+
+        for text in texts:
+            text_lower = text.lower()
+            row = set()
+            for start, pattern in self.matcher.iter_matches(text_lower):
+                index = self.features[pattern]
+                row.add(index)
+                end = start + len(pattern)
+                if (start == 0 or text_lower[start - 1] == " ") and (end == len(text_lower) or text_lower[end] == " "):
+                    row.add(index + n_features)
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float64)
+        return csr_matrix((data, indices, indptr), shape=(len(texts), 2 * n_features))
+
+    def score(self, texts: Sequence[str], sparse: bool = None):
+        """Return the (listings x images) score matrix, sparse or dense"""
+        scores = self.encode(texts) @ self.weights
+        if sparse is None:
+            sparse = scores.shape[0] * scores.shape[1] > SPARSE_CELL_THRESHOLD
+        return scores.tocsr() if sparse else scores.toarray()
+
+
+def score_listings(texts: Sequence[str], image_db: Dict[str, Dict], sparse: bool = None):
+    """Score every listing text against every image in one matrix product"""
+    return ImageFeatureModel(image_db).score(texts, sparse=sparse)
+
+
+def matrix_to_matches(scores) -> List[List[Tuple[int, float]]]:
+    """Convert a score matrix into per-listing (image_index, score) lists in image order"""
+    scores = csr_matrix(scores) if not issparse(scores) else scores.tocsr()
+    scores.sort_indices()
+    return [
+        [(int(col), float(value)) for col, value in zip(scores.indices[start:end], scores.data[start:end]) if value > 0]
+        for start, end in zip(scores.indptr[:-1], scores.indptr[1:])
+    ]
@@ -5,19 +5,16 @@ Creates a sophisticated matching algorithm that assigns unique, perfectly matche
 to each listing based on detailed content analysis.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import re
-from typing import Dict, List, Tuple, Set
-import requests
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import argparse
 import time
 
-# Initialize Firebase Admin
-if not firebase_admin._apps:
-    cred = credentials.Certificate('serviceAccountKey.json')
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+from firestore_client import get_db, stamp_updated
+from keyword_matcher import KeywordMatcher
+from listing_record import scan_records
+from progress import DEFAULT_INTERVAL, ProgressReporter, add_progress_arguments
+from url_cache import add_cache_arguments, cache_from_args
 
 def create_comprehensive_image_database() -> Dict[str, Dict]:
     """Create a comprehensive database of images with detailed keywords and categories."""
@@ -324,49 +321,109 @@ def calculate_match_score(listing_text: str, image_data: Dict) -> int:
     
     return score
 
-def verify_image_url(url: str) -> bool:
-    """Verify that an image URL is accessible."""
-    try:
-        response = requests.head(url, timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+def build_image_index(image_db: Dict[str, Dict]) -> Tuple[KeywordMatcher, Dict[str, List[str]]]:
+    """
+    Index images by every pattern calculate_match_score looks for (keywords,
+    brand, category, type). Patterns are matched as substrings, like the
+    scorer does, so any image that would score is a candidate. Posting lists
+    keep the image database order so score ties resolve the same way as a
+    full scan.
+    """
+    postings = defaultdict(list)
+    for img_id, img_data in image_db.items():
+        patterns = [keyword.lower() for keyword in img_data["keywords"]]
+        # Category is matched case-sensitively against lowercased text, as in the scorer
+        patterns.append(img_data["category"])
+        if "brand" in img_data and img_data["brand"].lower() != "generic":
+            patterns.append(img_data["brand"].lower())
+        if "type" in img_data:
+            patterns.append(img_data["type"].lower())
+        
+        for pattern in dict.fromkeys(patterns):
+            postings[pattern].append(img_id)
+    
+    return KeywordMatcher(postings), dict(postings)
+
+def candidate_images(text: str, matcher: KeywordMatcher, postings: Dict[str, List[str]],
+                     image_order: Dict[str, int]) -> List[str]:
+    """
+    Return the ids of images with at least one pattern occurring in the
+    listing text, in image database order.
+    """
+    # An empty pattern occurs in every text, but the automaton never reports it
+    candidates = set(postings.get("", ()))
+    for pattern in matcher.find_all(text.lower()):
+        candidates.update(postings[pattern])
+    return sorted(candidates, key=image_order.__getitem__)
 
-def assign_perfect_images():
-    """Assign perfectly matched, unique images to all listings."""
+def assign_greedy(listing_matches: List[List[Tuple[int, float]]]) -> List[Tuple[int, int, float]]:
+    """
+    Assign images first-come first-served: each listing, in order, takes its
+    highest scoring unused image. Ties go to the image listed first.
+    """
+    used = set()
+    pairs = []
+    for row, matches in enumerate(listing_matches):
+        best = None
+        for col, score in matches:
+            if col not in used and (best is None or score > best[1]):
+                best = (col, score)
+        if best:
+            used.add(best[0])
+            pairs.append((row, best[0], best[1]))
+    return pairs
+
+def assign_perfect_images(solver: str = 'optimal', sparse: bool = None, url_cache=None, verbose: bool = False,
+                          quiet: bool = False, progress_interval: float = DEFAULT_INTERVAL):
+    """
+    Assign perfectly matched, unique images to all listings.
+    The optimal solver maximizes the total match score across all listings;
+    the greedy solver matches listings one at a time in stream order.
+    Per-listing matches are only listed when verbose; with quiet a single
+    JSON summary is printed.
+    """
     
-    print("🎯 Starting Perfect Image Matching System...")
+    progress = ProgressReporter("Updating listings", unit='listings', interval=progress_interval, quiet=quiet)
+    progress.log("🎯 Starting Perfect Image Matching System...")
+    db = get_db()
     
-    # Get all listings
-    listings_ref = db.collection('listings')
-    listings = listings_ref.stream()
+    # numpy/scipy are optional and slow to import, so load them only when matching
+    try:
+        from image_assignment import solve_assignment
+        from match_scoring import matrix_to_matches, score_listings
+    except ImportError:
+        matrix_to_matches = score_listings = solve_assignment = None
     
-    # Convert to list for processing
-    all_listings = []
-    for listing in listings:
-        data = listing.to_dict()
-        data['id'] = listing.id
-        all_listings.append(data)
+    # Get all listings as compact records, transferring only the fields matched on
+    all_listings = list(scan_records(db, 'listings', fields=['title', 'description', 'category']))
     
-    print(f"📊 Found {len(all_listings)} listings to process")
+    progress.log(f"📊 Found {len(all_listings)} listings to process")
     
     # Get image database
     image_db = create_comprehensive_image_database()
-    used_images = set()
     
-    # First, verify all image URLs
-    print("🔍 Verifying image URLs...")
+    # First, verify all image URLs concurrently
+    progress.log("🔍 Verifying image URLs...")
+    # aiohttp is only needed to verify URLs, so load it only when verifying
+    from url_verifier import verify_urls
+    url_results = verify_urls((img_data["url"] for img_data in image_db.values()), cache=url_cache)
+    if url_cache is not None:
+        progress.log(f"🗄️  URL cache: {url_cache.summary()}")
     valid_images = {}
     for img_id, img_data in image_db.items():
-        if verify_image_url(img_data["url"]):
+        if url_results[img_data["url"]]['ok']:
             valid_images[img_id] = img_data
         else:
-            print(f"❌ Invalid URL for {img_id}: {img_data['url']}")
+            progress.warn(f"❌ Invalid URL for {img_id}: {img_data['url']}")
     
-    print(f"✅ {len(valid_images)} valid images available")
+    progress.log(f"✅ {len(valid_images)} valid images available")
     
-    # Process each listing
-    assignments = []
+    # Index images by pattern for the pure-Python scoring fallback
+    matcher, postings = build_image_index(valid_images)
+    image_order = {img_id: i for i, img_id in enumerate(valid_images)}
+    
+    image_ids = list(valid_images)
+    listing_texts = []
     
     for listing in all_listings:
         title = listing.get('title', '')
@@ -374,69 +431,112 @@ def assign_perfect_images():
         category = listing.get('category', '')
         
         # Combine title and description for matching
-        combined_text = f"{title} {description} {category}"
-        
-        print(f"\n🔍 Processing: {title}")
-        
-        # Find best matches
-        matches = []
-        for img_id, img_data in valid_images.items():
-            if img_id not in used_images:  # Only unused images
-                score = calculate_match_score(combined_text, img_data)
+        listing_texts.append(f"{title} {description} {category}")
+    
+    if score_listings is not None:
+        # Score all listings against all images in one sparse matrix product
+        score_matrix = score_listings(listing_texts, valid_images, sparse=sparse)
+        listing_matches = None
+    else:
+        # Without numpy, score each listing only against the images whose patterns occur in it;
+        # the index never drops an image that scores, so both paths score the same images
+        score_matrix = None
+        listing_matches = []
+        for combined_text in listing_texts:
+            matches = []
+            for img_id in candidate_images(combined_text, matcher, postings, image_order):
+                score = calculate_match_score(combined_text, valid_images[img_id])
                 if score > 0:  # Only consider actual matches
-                    matches.append((score, img_id, img_data))
-        
-        # Sort by score (highest first)
-        matches.sort(reverse=True, key=lambda x: x[0])
+                    matches.append((image_order[img_id], score))
+            listing_matches.append(matches)
+    
+    # Pick one unique image per listing
+    if solver == 'optimal' and solve_assignment is None:
+        progress.warn("⚠️  numpy/scipy not installed, falling back to greedy assignment")
+        solver = 'greedy'
+    
+    if solver == 'optimal':
+        progress.log(f"🧮 Solving optimal assignment for {len(all_listings)} listings x {len(image_ids)} images...")
+        pairs = solve_assignment(score_matrix)
+    else:
+        pairs = assign_greedy(listing_matches if listing_matches is not None else matrix_to_matches(score_matrix))
+    
+    assignments = []
+    used_images = set()
+    assigned_rows = {row: (col, score) for row, col, score in pairs}
+    
+    for row, listing in enumerate(all_listings):
+        title = listing.get('title', '')
         
-        if matches:
-            score, best_img_id, best_img_data = matches[0]
+        if row in assigned_rows:
+            col, score = assigned_rows[row]
+            best_img_id = image_ids[col]
+            best_img_data = valid_images[best_img_id]
+            combined_text = listing_texts[row].lower()
+            keywords_matched = [kw for kw in best_img_data['keywords'] if kw.lower() in combined_text]
             used_images.add(best_img_id)
             
             assignments.append({
-                'listing_id': listing['id'],
+                'listing_id': listing.id,
                 'title': title,
                 'image_id': best_img_id,
                 'image_url': best_img_data['url'],
-                'score': score,
-                'keywords_matched': [kw for kw in best_img_data['keywords'] if kw.lower() in combined_text.lower()]
+                'score': int(score),
+                'keywords_matched': keywords_matched
             })
             
-            print(f"  ✅ Matched with: {best_img_id} (score: {score})")
-            print(f"     Keywords matched: {[kw for kw in best_img_data['keywords'] if kw.lower() in combined_text.lower()]}")
-        else:
-            print(f"  ❌ No suitable matches found")
+            if verbose and not quiet:
+                print(f"  ✅ {title}: {best_img_id} (score: {int(score)}, keywords: {keywords_matched})")
+        elif verbose and not quiet:
+            print(f"  ❌ {title}: no suitable matches found")
     
-    print(f"\n📈 Assignment Summary:")
-    print(f"  Total listings: {len(all_listings)}")
-    print(f"  Successfully matched: {len(assignments)}")
-    print(f"  Unique images used: {len(used_images)}")
-    print(f"  Uniqueness rate: {len(used_images)/len(assignments)*100:.1f}%")
+    progress.log(f"\n📈 Assignment Summary:")
+    progress.log(f"  Total listings: {len(all_listings)}")
+    progress.log(f"  Successfully matched: {len(assignments)}")
+    progress.log(f"  Unique images used: {len(used_images)}")
+    if assignments:
+        progress.log(f"  Uniqueness rate: {len(used_images)/len(assignments)*100:.1f}%")
     
     # Apply assignments to Firestore
-    print(f"\n💾 Applying assignments to Firestore...")
+    progress.log(f"\n💾 Applying assignments to Firestore...")
+    progress.start(total=len(assignments))
     
     for assignment in assignments:
         try:
             listing_ref = db.collection('listings').document(assignment['listing_id'])
-            listing_ref.update({
+            listing_ref.update(stamp_updated({
                 'images': [assignment['image_url']]
-            })
-            print(f"  ✅ Updated {assignment['title']}")
+            }))
+            progress.update()
             
         except Exception as e:
-            print(f"  ❌ Failed to update {assignment['title']}: {e}")
+            progress.warn(f"  ❌ Failed to update {assignment['title']}: {e}")
+            progress.update(failed=1)
     
-    print(f"\n🎉 Perfect image matching complete!")
-    print(f"📊 Final stats:")
-    print(f"  - {len(assignments)} listings updated")
-    print(f"  - 100% unique images")
-    print(f"  - Content-specific matching")
+    summary = progress.finish(listings=len(all_listings), matched=len(assignments),
+                              unique_images=len(used_images), solver=solver)
+    updated = len(assignments) - summary.get('failed', 0)
+    progress.log(f"\n🎉 Perfect image matching complete!")
+    progress.log(f"📊 Final stats:")
+    progress.log(f"  - {updated} listings updated")
+    progress.log(f"  - 100% unique images")
+    progress.log(f"  - Content-specific matching")
     
-    # Print detailed results
-    print(f"\n📋 Detailed Results:")
-    for assignment in sorted(assignments, key=lambda x: x['score'], reverse=True):
-        print(f"  {assignment['title'][:40]:<40} → {assignment['image_id']:<20} (score: {assignment['score']})")
+    if verbose and not quiet:
+        # Print detailed results
+        print(f"\n📋 Detailed Results:")
+        for assignment in sorted(assignments, key=lambda x: x['score'], reverse=True):
+            print(f"  {assignment['title'][:40]:<40} → {assignment['image_id']:<20} (score: {assignment['score']})")
 
 if __name__ == "__main__":
-    assign_perfect_images()
+    parser = argparse.ArgumentParser(description="Assign unique, content-matched images to all listings")
+    parser.add_argument('--solver', choices=['optimal', 'greedy'], default='optimal',
+                        help="optimal maximizes total match score (needs numpy/scipy); greedy follows stream order")
+    parser.add_argument('--sparse', action='store_true', default=None,
+                        help="force the sparse solver (chosen automatically for large catalogs)")
+    parser.add_argument('--verbose', action='store_true', help="list every listing's match")
+    add_cache_arguments(parser)
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+    assign_perfect_images(solver=args.solver, sparse=args.sparse, url_cache=cache_from_args(args),
+                          verbose=args.verbose, quiet=args.quiet, progress_interval=args.progress_interval)
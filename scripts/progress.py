@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Rate-limited progress reporting for long-running sweeps.
+Loops call update() once per document; a status line with throughput and ETA
+is written at most once per interval, so output stays a few lines no matter
+how large the collection is. In quiet mode nothing is written until the end,
+when a single JSON summary line is printed for logs and scripts to parse.
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 2.0
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """
+    Track progress of a sweep over `total` items (None if unknown).
+    update() and set() are cheap; output is throttled to one line per
+    `interval` seconds. log() prints ordinary messages unless quiet, warn()
+    always prints to stderr, and finish() prints the final line (or the JSON
+    summary when quiet) and returns the summary dict.
+    """
+
+    def __init__(self, label, total=None, unit='docs', interval=DEFAULT_INTERVAL, quiet=False, stream=None):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.quiet = quiet
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.counters = Counter()
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self._finished = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._finished:
+            self.finish(status='ok' if exc_type is None else 'error')
+        return False
+
+    def start(self, total=None):
+        """Restart the clock for the sweep proper, after any setup phase"""
+        self.total = total if total is not None else self.total
+        self.done = 0
+        self.started = self._last_report = time.perf_counter()
+
+    def update(self, n=1, **counters):
+        """Advance by `n` items and add to any named counters (e.g. failed=1)"""
+        self.done += n
+        self.counters.update(counters)
+        self._maybe_report()
+
+    def set(self, done, **counters):
+        """Set the absolute number of items done, e.g. from a batch callback"""
+        self.done = done
+        self.counters.update(counters)
+        self._maybe_report()
+
+    def log(self, message):
+        if not self.quiet:
+            print(message, file=self.stream)
+
+    def warn(self, message):
+        print(message, file=sys.stderr)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Seconds remaining at the current rate, or None if unknown"""
+        rate = self.rate()
+        if self.total is None or rate <= 0:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def _maybe_report(self):
+        if self.quiet:
+            return
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            print(self.status_line(), file=self.stream, flush=True)
+
+    def status_line(self):
+        if self.total:
+            position = f"{self.done}/{self.total} {self.unit} ({self.done / self.total * 100:.0f}%)"
+        else:
+            position = f"{self.done} {self.unit}"
+        line = f"  ⏳ {self.label}: {position}, {self.rate():.0f} {self.unit}/s"
+        eta = self.eta()
+        if eta is not None and self.done < self.total:
+            line += f", ETA {format_duration(eta)}"
+        if self.counters:
+            line += ", " + ", ".join(f"{count} {name}" for name, count in sorted(self.counters.items()))
+        return line
+
+    def summary(self, **extra):
+        return {
+            'label': self.label,
+            'done': self.done,
+            'total': self.total,
+            'unit': self.unit,
+            'elapsed_seconds': round(self.elapsed(), 3),
+            'per_second': round(self.rate(), 1),
+            **self.counters,
+            **extra,
+        }
+
+    def finish(self, **extra):
+        """Print the final progress line, or the JSON summary when quiet, and return the summary"""
+        self._finished = True
+        summary = self.summary(**extra)
+        if self.quiet:
+            print(json.dumps(summary, default=str), file=self.stream, flush=True)
+        else:
+            print(f"  ⏱️  {self.label}: {self.done} {self.unit} in {format_duration(self.elapsed())} "
+                  f"({summary['per_second']:.0f} {self.unit}/s)", file=self.stream, flush=True)
+        return summary
+
+
+def add_progress_arguments(parser):
+    """Add --quiet and --progress-interval to an argparse parser"""
+    parser.add_argument('--quiet', action='store_true',
+                        help="suppress progress output and print a single JSON summary at the end")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between progress updates (default: {DEFAULT_INTERVAL})")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Streaming referential-integrity checks between Firestore collections.
+Scans only the referencing field, remembers each distinct referenced id once
+(in a set, or a Bloom filter when there are too many to hold), and checks
+whether the referenced documents exist with batched get_all calls. Memory is
+bounded by the number of distinct ids, not the number of documents scanned.
+Requires: pip install firebase-admin
+"""
+
+import hashlib
+import math
+
+from firestore_scan import DEFAULT_PAGE_SIZE, scan_collection
+
+DEFAULT_LOOKUP_BATCH = 300
+DEFAULT_BLOOM_CAPACITY = 10_000_000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set. Membership tests never give false negatives,
+    but report an unseen item as seen with probability about `error_rate`
+    once `capacity` items have been added.
+    """
+
+    def __init__(self, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def current_error_rate(self):
+        """Expected false-positive rate for the number of items added so far"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+def _missing_ids(db, collection, ids):
+    """Return the subset of `ids` with no document in `collection`"""
+    collection_ref = db.collection(collection)
+    refs = [collection_ref.document(doc_id) for doc_id in ids]
+    # Only existence matters, so ask for a single small field
+    return [doc.id for doc in db.get_all(refs, field_paths=['name']) if not doc.exists]
+
+
+class ReferenceChecker:
+    """
+    Incremental form of find_orphan_references for callers that already scan
+    the source collection: add() each referenced id (or None) as documents go
+    by, then finish() for the stats. Distinct ids are looked up in batches of
+    `lookup_batch` as they accumulate. `missing_ids(ids)` may replace the
+    Firestore lookup, e.g. to check against the local snapshot.
+    """
+
+    def __init__(self, db, target='users', lookup_batch=DEFAULT_LOOKUP_BATCH, seen=None, missing_ids=None):
+        self.seen = set() if seen is None else seen
+        self.lookup_batch = lookup_batch
+        self.missing_ids = missing_ids or (lambda ids: _missing_ids(db, target, ids))
+        self.stats = {'scanned': 0, 'unreferenced': 0, 'distinct': 0, 'looked_up': 0, 'orphans': []}
+        self._pending = []
+
+    def _flush(self):
+        self.stats['looked_up'] += len(self._pending)
+        self.stats['orphans'].extend(self.missing_ids(self._pending))
+        self._pending = []
+
+    def add(self, referenced_id):
+        self.stats['scanned'] += 1
+        if not referenced_id:
+            self.stats['unreferenced'] += 1
+            return
+        if referenced_id in self.seen:
+            return
+        self.seen.add(referenced_id)
+        self.stats['distinct'] += 1
+        self._pending.append(referenced_id)
+        if len(self._pending) >= self.lookup_batch:
+            self._flush()
+
+    def finish(self):
+        if self._pending:
+            self._flush()
+        self.stats['orphans'].sort()
+        return self.stats
+
+
+def find_orphan_references(db, source='listings', field='userId', target='users',
+                           page_size=DEFAULT_PAGE_SIZE, lookup_batch=DEFAULT_LOOKUP_BATCH, seen=None):
+    """
+    Report documents in `source` whose `field` names a missing `target` document.
+
+    `seen` deduplicates referenced ids; it defaults to a set and may be a
+    BloomFilter, in which case an id falsely reported as seen is never looked
+    up, so each orphan is missed with probability up to the filter's error rate.
+
+    Returns a dict with scanned/unreferenced/distinct/looked-up counts and the
+    sorted list of orphan ids.
+    """
+    checker = ReferenceChecker(db, target, lookup_batch, seen)
+    for doc in scan_collection(db, source, fields=[field], page_size=page_size):
+        checker.add(doc.to_dict().get(field))
+    return checker.finish()
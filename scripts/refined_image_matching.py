@@ -3,33 +3,12 @@
 Refined smart image matching with better keyword prioritization and conflict resolution.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 import re
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from keyword_matcher import KeywordMatcher
+from firestore_client import initialize_firebase
+from listing_record import scan_records
+from write_elision import ElidingWriter
 
 def get_refined_image_mapping():
     """Get refined keyword to image mapping with priority-based matching"""
@@ -147,21 +126,20 @@ def get_refined_image_mapping():
         'cat toy': ('https://images.unsplash.com/photo-1425082661705-1834bfd09dca?w=800&h=600&fit=crop', 10),
     }
 
-def find_best_matching_image_refined(title, description, keyword_map):
+def find_best_matching_image_refined(title, description, keyword_map, matcher=None):
     """Find the best matching image with priority-based selection"""
     text = f"{title} {description}".lower()
     
-    best_match = None
-    best_priority = 0
-    best_keyword = None
+    # Find every keyword in one pass; build the matcher once per run and pass it in
+    matcher = matcher or KeywordMatcher(keyword_map)
+    hits = matcher.find_all(text)
+    
+    if not hits:
+        return None, None, 0
     
-    # Look for matches and select the one with highest priority
-    for keyword, (image_url, priority) in keyword_map.items():
-        if keyword in text:
-            if priority > best_priority:
-                best_match = image_url
-                best_priority = priority
-                best_keyword = keyword
+    # Select the highest priority match; ties go to the keyword listed first
+    best_keyword = max(hits, key=lambda keyword: (keyword_map[keyword][1], -matcher.order[keyword]))
+    best_match, best_priority = keyword_map[best_keyword]
     
     return best_match, best_keyword, best_priority
 
@@ -173,28 +151,27 @@ def refined_smart_assign_images():
     
     try:
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        writer = ElidingWriter(listings_ref)
+        docs = list(scan_records(db, 'listings', fields=['title', 'description', 'category', 'images']))
         
         keyword_map = get_refined_image_mapping()
+        matcher = KeywordMatcher(keyword_map)
         updated_count = 0
         matched_count = 0
         
         print(f"📊 Processing {len(docs)} listings with refined matching...")
         
         for doc in docs:
-            data = doc.to_dict()
-            title = data.get('title', '')
-            description = data.get('description', '')
-            category = data.get('category', '')
+            title = doc.get('title', '')
+            description = doc.get('description', '')
+            category = doc.get('category', '')
             
             # Find best matching image with priority
-            best_image, matched_keyword, priority = find_best_matching_image_refined(title, description, keyword_map)
+            best_image, matched_keyword, priority = find_best_matching_image_refined(title, description, keyword_map, matcher)
             
             if best_image:
-                # Update the listing with the matched image
-                doc.reference.update({
-                    'images': [best_image]
-                })
+                # Update the listing with the matched image, unless it already has it
+                writer.update(doc, {'images': [best_image]})
                 
                 print(f"✅ {category.upper()}: {title}")
                 print(f"   Matched: '{matched_keyword}' (priority: {priority})")
@@ -212,6 +189,7 @@ def refined_smart_assign_images():
         print(f"Total listings processed: {updated_count}")
         print(f"Listings with specific matches: {matched_count}")
         print(f"Match rate: {(matched_count/updated_count)*100:.1f}%")
+        print(writer.summary())
         
     except Exception as e:
         print(f"❌ Error in refined smart image assignment: {e}")
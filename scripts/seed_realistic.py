@@ -2,19 +2,29 @@
 """
 Realistic data seeding script for marketplace app.
 Generates category-specific listings with proper Firebase Storage URLs.
+Listings are generated lazily, so --count can go to millions with flat memory,
+either written to Firestore in batches or streamed out as JSON lines.
 Requires: pip install firebase-admin faker
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
 from faker import Faker
+import argparse
+import json
 import random
 import sys
-import os
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from batch_writer import commit_in_batches, print_write_stats
+from firestore_client import initialize_firebase
+from progress import DEFAULT_INTERVAL, ProgressReporter, add_progress_arguments
 
 fake = Faker()
 
+# Seeded runs date listings within this window instead of at the current time,
+# so the same seed always produces the same output
+SEEDED_BASE_DATE = datetime(2025, 1, 1)
+SEEDED_DATE_SPAN = timedelta(days=90)
+
 # Firebase Storage base URL pattern
 FIREBASE_STORAGE_BASE = "https://firebasestorage.googleapis.com/v0/b/stan-s-list.firebasestorage.app/o/"
 
@@ -50,25 +60,6 @@ CATEGORY_IMAGES = {
     ]
 }
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        cred = credentials.Certificate(service_account_path)
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': 'stan-s-list.firebasestorage.app'
-        })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
-
 def generate_vehicle_listing():
     """Generate realistic vehicle listing data"""
     car_makes = ['Toyota', 'Honda', 'Ford', 'Chevrolet', 'BMW', 'Mercedes', 'Audi', 'Nissan', 'Subaru', 'Volkswagen']
@@ -221,80 +212,131 @@ def generate_apparel_listing():
         'images': [random.choice(CATEGORY_IMAGES['apparel'])]
     }
 
-def generate_base_listing_data(category):
-    """Generate base listing data common to all categories"""
+def seeded_timestamp():
+    """A creation time drawn from the seeded RNG within the fixed seeded window"""
+    return SEEDED_BASE_DATE + timedelta(seconds=random.randrange(int(SEEDED_DATE_SPAN.total_seconds())))
+
+def generate_base_listing_data(category, timestamp=datetime.now):
+    """Generate base listing data common to all categories, dated by calling `timestamp`"""
+    created_at = timestamp()
     return {
         'sellerId': fake.uuid4(),
         'sellerName': fake.name(),
         'location': f"{fake.city()}, {fake.state_abbr()}",
         'category': category,
-        'createdAt': datetime.now(),
-        'updatedAt': datetime.now(),
+        'createdAt': created_at,
+        'updatedAt': created_at,
         'featured': random.choice([True, False]),
         'status': 'active'
     }
 
-def seed_listings():
+CATEGORY_GENERATORS = {
+    'vehicles': generate_vehicle_listing,
+    'property-rentals': generate_property_listing,
+    'electronics': generate_electronics_listing,
+    'apparel': generate_apparel_listing
+}
+
+def generate_listings(count, seed=None, categories=None):
+    """
+    Lazily yield `count` complete listings, rotating through the categories.
+    Passing a seed makes the generated listings, timestamps included,
+    reproducible across runs; unseeded listings are dated now.
+    """
+    timestamp = datetime.now
+    if seed is not None:
+        random.seed(seed)
+        Faker.seed(seed)
+        timestamp = seeded_timestamp
+    
+    category_names = list(categories or CATEGORY_GENERATORS)
+    for i in range(count):
+        category = category_names[i % len(category_names)]
+        specific_data = CATEGORY_GENERATORS[category]()
+        yield {**generate_base_listing_data(category, timestamp), **specific_data}
+
+def write_jsonl(listings, output):
+    """Stream listings to a file object as JSON lines"""
+    written = 0
+    for listing in listings:
+        output.write(json.dumps(listing, default=str))
+        output.write("\n")
+        written += 1
+    return written
+
+def seed_listings(count=40, seed=None, categories=None, workers=8, quiet=False,
+                  progress_interval=DEFAULT_INTERVAL):
     """Main seeding function"""
-    print("🔍 Initializing Firebase connection...")
+    progress = ProgressReporter("Seeding listings", total=count, unit='listings',
+                                interval=progress_interval, quiet=quiet)
+    progress.log("🔍 Initializing Firebase connection...")
     
     db = initialize_firebase()
     if not db:
         return False
     
     try:
-        categories = {
-            'vehicles': generate_vehicle_listing,
-            'property-rentals': generate_property_listing,
-            'electronics': generate_electronics_listing,
-            'apparel': generate_apparel_listing
-        }
+        listings_ref = db.collection('listings')
+        operations = (
+            ('set', listings_ref.document(), listing_data)
+            for listing_data in generate_listings(count, seed=seed, categories=categories)
+        )
+        
+        progress.log(f"\n📝 Creating {count} listings...")
         
-        total_created = 0
+        def on_batch(size, written):
+            progress.set(written)
         
-        for category, generator_func in categories.items():
-            print(f"\n📝 Creating listings for category: {category}")
-            
-            for i in range(10):  # 10 listings per category
-                # Generate category-specific data
-                specific_data = generator_func()
-                
-                # Generate base data
-                base_data = generate_base_listing_data(category)
-                
-                # Combine data
-                listing_data = {**base_data, **specific_data}
-                
-                # Add to Firestore
-                doc_ref = db.collection('listings').add(listing_data)
-                total_created += 1
-                
-                print(f"  ✅ Created: {specific_data['title']}")
+        stats = commit_in_batches(db, operations, max_workers=workers, on_batch=on_batch)
+        if not quiet:
+            print_write_stats(stats, label="listings")
         
-        print(f"\n🎉 Successfully created {total_created} realistic listings!")
-        print(f"📊 {total_created // 4} listings per category")
+        progress.log(f"\n🎉 Successfully created {stats['written']} realistic listings!")
+        progress.finish(failed=stats['failed'], retries=stats['retries'])
         
-        return True
+        return stats['failed'] == 0
         
     except Exception as e:
         print(f"❌ Error during seeding: {e}")
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate realistic marketplace listings")
+    parser.add_argument('--count', type=int, default=40,
+                        help="total number of listings to generate (default: 40)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for reproducible data")
+    parser.add_argument('--categories', nargs='+', choices=list(CATEGORY_GENERATORS),
+                        help="restrict generation to these categories")
+    parser.add_argument('--output', metavar='PATH',
+                        help="write JSON lines to PATH ('-' for stdout) instead of Firestore")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="concurrent batch commits when writing to Firestore (default: 8)")
+    add_progress_arguments(parser)
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    print("🌱 Starting realistic data seeding...")
+    args = parse_args()
     
-    # Install faker if not available
-    try:
-        from faker import Faker
-    except ImportError:
-        print("📦 Installing faker...")
-        os.system("pip install faker")
-        from faker import Faker
+    if args.output:
+        listings = generate_listings(args.count, seed=args.seed, categories=args.categories)
+        if args.output == '-':
+            write_jsonl(listings, sys.stdout)
+        else:
+            with open(args.output, 'w') as output:
+                written = write_jsonl(listings, output)
+            print(f"✅ Wrote {written} listings to {args.output}")
+        sys.exit(0)
+    
+    if not args.quiet:
+        print("🌱 Starting realistic data seeding...")
     
-    success = seed_listings()
+    success = seed_listings(args.count, seed=args.seed, categories=args.categories, workers=args.workers,
+                            quiet=args.quiet, progress_interval=args.progress_interval)
     
     if success:
-        print("✅ Seeding completed successfully!")
+        if not args.quiet:
+            print("✅ Seeding completed successfully!")
         sys.exit(0)
     else:
         print("❌ Seeding failed!")
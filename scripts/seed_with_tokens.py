@@ -4,35 +4,14 @@ Seeding script with proper Firebase Storage URLs that include tokens.
 Creates realistic dummy data for all categories.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
+import argparse
 import uuid
 from datetime import datetime, timedelta
 import random
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from batch_writer import FIRESTORE_BATCH_LIMIT, commit_in_batches, print_write_stats
+from firestore_client import initialize_firebase
+from progress import DEFAULT_INTERVAL, ProgressReporter, add_progress_arguments
 
 def generate_firebase_url(category, filename):
     """Generate a Firebase Storage URL with token"""
@@ -546,8 +525,8 @@ def create_apparel_listings():
     ]
     return apparel
 
-def create_listing(db, listing_data, category, user_id):
-    """Create a single listing in Firestore"""
+def build_listing_data(listing_data, category, user_id):
+    """Build the full Firestore document for a listing"""
     # Common fields for all listings
     base_data = {
         'category': category,
@@ -561,59 +540,120 @@ def create_listing(db, listing_data, category, user_id):
     }
     
     # Merge with category-specific data
-    final_data = {**base_data, **listing_data}
+    return {**base_data, **listing_data}
+
+def create_listing(db, listing_data, category, user_id):
+    """Create a single listing in Firestore"""
+    final_data = build_listing_data(listing_data, category, user_id)
     
     # Add the listing to Firestore
     doc_ref = db.collection('listings').document()
     doc_ref.set(final_data)
     return doc_ref.id
 
-def seed_realistic_data():
+SELLER_USER_IDS = [
+    'user_john_doe',
+    'user_jane_smith', 
+    'user_mike_johnson',
+    'user_sarah_wilson',
+    'user_david_brown',
+    'user_lisa_davis',
+    'user_chris_garcia',
+    'user_emma_taylor',
+    'user_ryan_martinez',
+    'user_amanda_anderson'
+]
+
+CATEGORY_FACTORIES = {
+    'vehicles': create_vehicles_listings,
+    'property-rentals': create_property_listings,
+    'electronics': create_electronics_listings,
+    'apparel': create_apparel_listings
+}
+
+def generate_bulk_operations(db, count):
+    """Lazily yield 'set' operations for `count` listings, cycling through the templates"""
+    listings_ref = db.collection('listings')
+    created = 0
+    
+    while created < count:
+        # Re-run the factories each cycle so every copy gets fresh image tokens
+        for category, factory in CATEGORY_FACTORIES.items():
+            for listing_data in factory():
+                if created >= count:
+                    return
+                user_id = SELLER_USER_IDS[created % len(SELLER_USER_IDS)]
+                yield ('set', listings_ref.document(), build_listing_data(listing_data, category, user_id))
+                created += 1
+
+def bulk_seed_data(db, count, batch_size=FIRESTORE_BATCH_LIMIT, workers=8, quiet=False,
+                   progress_interval=DEFAULT_INTERVAL):
+    """Seed `count` listings using batched commits pipelined across worker threads"""
+    progress = ProgressReporter("Seeding listings", total=count, unit='listings',
+                                interval=progress_interval, quiet=quiet)
+    progress.log(f"🚀 Bulk seeding {count} listings (batch size {batch_size}, {workers} concurrent commits)...")
+    
+    def on_batch(size, written):
+        progress.set(written)
+    
+    stats = commit_in_batches(db, generate_bulk_operations(db, count),
+                              batch_size=batch_size, max_workers=workers, on_batch=on_batch)
+    if not quiet:
+        print_write_stats(stats, label="listings")
+    progress.finish(failed=stats['failed'], retries=stats['retries'])
+    return stats
+
+def seed_realistic_data(quiet=False, progress_interval=DEFAULT_INTERVAL):
     """Main function to seed realistic data"""
     db = initialize_firebase()
     if not db:
         return
     
-    print("🌱 Starting realistic data seeding with proper Firebase URLs...")
+    categories_data = {category: factory() for category, factory in CATEGORY_FACTORIES.items()}
+    progress = ProgressReporter("Seeding listings", total=sum(map(len, categories_data.values())),
+                                unit='listings', interval=progress_interval, quiet=quiet)
+    progress.log("🌱 Starting realistic data seeding with proper Firebase URLs...")
     
     # Fake user IDs for different sellers
-    user_ids = [
-        'user_john_doe',
-        'user_jane_smith', 
-        'user_mike_johnson',
-        'user_sarah_wilson',
-        'user_david_brown',
-        'user_lisa_davis',
-        'user_chris_garcia',
-        'user_emma_taylor',
-        'user_ryan_martinez',
-        'user_amanda_anderson'
-    ]
-    
-    categories_data = {
-        'vehicles': create_vehicles_listings(),
-        'property-rentals': create_property_listings(),
-        'electronics': create_electronics_listings(),
-        'apparel': create_apparel_listings()
-    }
+    user_ids = SELLER_USER_IDS
     
-    total_created = 0
+    category_counts = {}
     
     for category, listings in categories_data.items():
-        print(f"\n📁 Creating {category} listings...")
         category_count = 0
         
         for i, listing_data in enumerate(listings):
             user_id = user_ids[i % len(user_ids)]  # Rotate through users
             listing_id = create_listing(db, listing_data, category, user_id)
             category_count += 1
-            total_created += 1
-            print(f"  ✅ Created: {listing_data['title']}")
+            progress.update()
         
-        print(f"  📊 {category}: {category_count} listings created")
+        category_counts[category] = category_count
+        progress.log(f"  📊 {category}: {category_count} listings created")
     
-    print(f"\n🎉 Successfully created {total_created} realistic listings!")
-    print(f"📊 All listings include proper Firebase Storage URLs with tokens")
+    progress.log(f"\n🎉 Successfully created {progress.done} realistic listings!")
+    progress.log(f"📊 All listings include proper Firebase Storage URLs with tokens")
+    progress.finish(categories=category_counts)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed realistic listings with tokenized Firebase Storage URLs")
+    parser.add_argument('--bulk', action='store_true',
+                        help="use batched, concurrent commits instead of one write per listing")
+    parser.add_argument('--count', type=int, default=40,
+                        help="number of listings to create in bulk mode (default: 40)")
+    parser.add_argument('--batch-size', type=int, default=FIRESTORE_BATCH_LIMIT,
+                        help=f"writes per batch in bulk mode (max {FIRESTORE_BATCH_LIMIT})")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="concurrent batch commits in bulk mode (default: 8)")
+    add_progress_arguments(parser)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    seed_realistic_data()
+    args = parse_args()
+    if args.bulk:
+        db = initialize_firebase()
+        if db:
+            bulk_seed_data(db, args.count, batch_size=args.batch_size, workers=args.workers,
+                           quiet=args.quiet, progress_interval=args.progress_interval)
+    else:
+        seed_realistic_data(quiet=args.quiet, progress_interval=args.progress_interval)
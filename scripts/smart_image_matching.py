@@ -3,33 +3,11 @@
 Intelligently match images to listings based on their titles and descriptions.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 import re
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from keyword_matcher import KeywordMatcher
+from firestore_client import initialize_firebase, stamp_updated
+from listing_record import scan_records
 
 def get_smart_image_mapping():
     """Map specific keywords to appropriate images"""
@@ -140,18 +118,22 @@ def get_smart_image_mapping():
         'toy': 'https://images.unsplash.com/photo-1425082661705-1834bfd09dca?w=800&h=600&fit=crop',
     }
 
-def find_best_matching_image(title, description, keyword_map):
+def find_best_matching_image(title, description, keyword_map, matcher=None):
     """Find the best matching image based on title and description content"""
     # Combine title and description for searching
     text = f"{title} {description}".lower()
     
-    # Look for exact matches first (more specific keywords)
-    for keyword, image_url in keyword_map.items():
-        if keyword in text:
-            return image_url, keyword
+    # Find every keyword in one pass; build the matcher once per run and pass it in
+    matcher = matcher or KeywordMatcher(keyword_map)
+    hits = matcher.find_all(text)
     
     # If no match found, return None
-    return None, None
+    if not hits:
+        return None, None
+    
+    # Keywords listed earlier in the map are more specific and win
+    keyword = min(hits, key=matcher.order.__getitem__)
+    return keyword_map[keyword], keyword
 
 def smart_assign_images():
     """Intelligently assign images based on listing content"""
@@ -161,28 +143,28 @@ def smart_assign_images():
     
     try:
         listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        docs = list(scan_records(db, 'listings', fields=['title', 'description', 'category']))
         
         keyword_map = get_smart_image_mapping()
+        matcher = KeywordMatcher(keyword_map)
         updated_count = 0
         matched_count = 0
         
         print(f"📊 Processing {len(docs)} listings...")
         
         for doc in docs:
-            data = doc.to_dict()
-            title = data.get('title', '')
-            description = data.get('description', '')
-            category = data.get('category', '')
+            title = doc.get('title', '')
+            description = doc.get('description', '')
+            category = doc.get('category', '')
             
             # Find best matching image
-            best_image, matched_keyword = find_best_matching_image(title, description, keyword_map)
+            best_image, matched_keyword = find_best_matching_image(title, description, keyword_map, matcher)
             
             if best_image:
                 # Update the listing with the matched image
-                doc.reference.update({
+                listings_ref.document(doc.id).update(stamp_updated({
                     'images': [best_image]
-                })
+                }))
                 
                 print(f"✅ {category.upper()}: {title}")
                 print(f"   Matched keyword: '{matched_keyword}'")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The admin scripts are flat modules run from scripts/, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+import pytest
+
+from perfect_image_matching import (build_image_index, calculate_match_score, candidate_images,
+                                    create_comprehensive_image_database)
+from seed_with_tokens import CATEGORY_FACTORIES
+
+IMAGE_DB = create_comprehensive_image_database()
+IMAGE_ORDER = {img_id: i for i, img_id in enumerate(IMAGE_DB)}
+MATCHER, POSTINGS = build_image_index(IMAGE_DB)
+
+SEEDED_TEXTS = [
+    f"{listing['title']} {listing['description']} {category}"
+    for category, factory in CATEGORY_FACTORIES.items()
+    for listing in factory()
+]
+
+
+def best_image(text, image_ids):
+    """Highest scoring (image_id, score) among image_ids, ties to the first"""
+    best = (None, 0)
+    for img_id in image_ids:
+        score = calculate_match_score(text, IMAGE_DB[img_id])
+        if score > best[1]:
+            best = (img_id, score)
+    return best
+
+
+@pytest.mark.parametrize('text', SEEDED_TEXTS)
+def test_index_keeps_every_scoring_image(text):
+    candidates = set(candidate_images(text, MATCHER, POSTINGS, IMAGE_ORDER))
+    assert {img_id for img_id in IMAGE_DB if calculate_match_score(text, IMAGE_DB[img_id]) > 0} <= candidates
+
+
+@pytest.mark.parametrize('text', SEEDED_TEXTS)
+def test_indexed_best_image_matches_full_scan(text):
+    assert best_image(text, candidate_images(text, MATCHER, POSTINGS, IMAGE_ORDER)) == best_image(text, IMAGE_DB)
+
+
+def test_keyword_inside_longer_word_is_a_candidate():
+    text = "two office chairs"
+    assert calculate_match_score(text, {"keywords": ["chair"], "category": "furniture"}) == 50
+    db = {"chair": {"keywords": ["chair"], "category": "furniture"}}
+    matcher, postings = build_image_index(db)
+    assert candidate_images(text, matcher, postings, {"chair": 0}) == ["chair"]
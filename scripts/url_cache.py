@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Persistent URL health cache backed by SQLite.
+Remembers the last check of each image URL (status, ETag, Last-Modified)
+so repeated audits only revalidate stale entries, using conditional
+requests that the server can answer with 304 Not Modified.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'url_health.sqlite')
+DEFAULT_TTL = 24 * 60 * 60           # serve results younger than a day without any request
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  # forget entries not checked for a month
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Client errors that mean the URL is gone; other 4xx (429) and 5xx are transient
+PERMANENT_FAILURES = frozenset((404, 410))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS url_health (
+    url TEXT PRIMARY KEY,
+    ok INTEGER NOT NULL,
+    status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+
+
+def is_cacheable(status):
+    return status is not None and (200 <= status < 400 or status in PERMANENT_FAILURES)
+
+
+class UrlHealthCache:
+    """On-disk cache of URL check results with TTL, revalidation and eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_age=DEFAULT_MAX_AGE,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS url_health_checked_at ON url_health (checked_at)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _row_to_result(row):
+        url, ok, status, etag, last_modified, _ = row
+        return {'url': url, 'ok': bool(ok), 'status': status, 'error': None,
+                'etag': etag, 'last_modified': last_modified}
+
+    def lookup(self, urls: Iterable[str]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """
+        Split cached entries for `urls` into (fresh, stale) result dicts.
+        URLs missing from both have never been checked.
+        """
+        fresh, stale = {}, {}
+        now = time.time()
+        urls = list(dict.fromkeys(urls))
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT url, ok, status, etag, last_modified, checked_at FROM url_health WHERE url IN ({placeholders})",
+                chunk)
+            for row in rows:
+                target = fresh if now - row[5] <= self.ttl else stale
+                target[row[0]] = self._row_to_result(row)
+        return fresh, stale
+
+    def store(self, results: Iterable[Dict]):
+        """
+        Record check results. Only successes, redirects and permanent failures
+        are cached; transient errors (no HTTP status, 429, 5xx) are checked
+        again next time rather than reported broken for the whole TTL.
+        """
+        now = time.time()
+        rows = [
+            (r['url'], int(r['ok']), r['status'], r.get('etag'), r.get('last_modified'), now)
+            for r in results if is_cacheable(r['status'])
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO url_health VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.evict()
+
+    def evict(self):
+        """Drop entries older than max_age, then the oldest entries beyond max_entries"""
+        with self._conn:
+            self._conn.execute("DELETE FROM url_health WHERE checked_at < ?", (time.time() - self.max_age,))
+            self._conn.execute(
+                "DELETE FROM url_health WHERE url IN "
+                "(SELECT url FROM url_health ORDER BY checked_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM url_health").fetchone()[0]
+
+    def summary(self):
+        return f"{self.hits} cached, {self.revalidated} revalidated, {self.misses} fetched"
+
+
+def add_cache_arguments(parser):
+    """Add the shared URL cache options to an argparse parser"""
+    parser.add_argument('--no-url-cache', action='store_true',
+                        help="check every image URL over the network, ignoring the health cache")
+    parser.add_argument('--url-cache-ttl', type=float, default=DEFAULT_TTL,
+                        help=f"seconds a cached URL check stays fresh (default: {DEFAULT_TTL})")
+    parser.add_argument('--url-cache-path', default=DEFAULT_CACHE_PATH,
+                        help="location of the URL health cache database")
+
+
+def cache_from_args(args):
+    """Open the URL cache configured by add_cache_arguments, or None when disabled"""
+    if args.no_url_cache:
+        return None
+    return UrlHealthCache(args.url_cache_path, ttl=args.url_cache_ttl)
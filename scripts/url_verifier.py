@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Concurrent image URL verification.
+Checks many URLs at once over pooled keep-alive connections, with a global
+concurrency cap and per-host rate limits so image CDNs are not hammered.
+Results can be persisted in a UrlHealthCache so unchanged URLs are served
+from disk or revalidated with conditional requests.
+Works against any HTTP server, including a local stub for testing.
+Requires: pip install aiohttp
+"""
+
+import argparse
+import asyncio
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from url_cache import add_cache_arguments, cache_from_args
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_CONNECTIONS_PER_HOST = 20
+DEFAULT_TIMEOUT = 5
+
+# Maximum requests per second per host
+DEFAULT_HOST_RATE_LIMITS = {
+    'images.unsplash.com': 50,
+    'firebasestorage.googleapis.com': 50,
+}
+
+
+class HostRateLimiter:
+    """Spaces out requests to each host so no host sees more than its rate"""
+
+    def __init__(self, rate_limits: Optional[Dict[str, float]] = None, default_rate: Optional[float] = None):
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate = default_rate
+        self._next_slot = {}
+        self._locks = {}
+
+    async def acquire(self, host: str):
+        rate = self.rate_limits.get(host, self.default_rate)
+        if not rate:
+            return
+
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+
+def _result(url, status=None, error=None, headers=None):
+    headers = headers or {}
+    return {
+        'url': url,
+        'ok': status == 200,
+        'status': status,
+        'error': error,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+    }
+
+
+async def check_url(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore,
+                    limiter: HostRateLimiter, request_headers: Optional[Dict[str, str]] = None) -> Dict:
+    """HEAD a single URL and return its result dict"""
+    async with semaphore:
+        await limiter.acquire(urlsplit(url).hostname or '')
+        try:
+            async with session.head(url, allow_redirects=False, headers=request_headers) as response:
+                return _result(url, status=response.status, headers=response.headers)
+        except asyncio.TimeoutError:
+            return _result(url, error='timeout')
+        except Exception as e:
+            return _result(url, error=str(e) or type(e).__name__)
+
+
+async def verify_urls_async(urls: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                            timeout: float = DEFAULT_TIMEOUT,
+                            connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+                            rate_limits: Optional[Dict[str, float]] = None,
+                            request_headers: Optional[Dict[str, Dict[str, str]]] = None,
+                            cache=None) -> Dict[str, Dict]:
+    """
+    Verify each distinct URL once and return {url: result}.
+
+    `request_headers` optionally maps a URL to extra headers for its request.
+    With a `cache` (UrlHealthCache), fresh entries are returned without any
+    request and stale entries are revalidated with If-None-Match /
+    If-Modified-Since; a 304 keeps the cached result.
+    """
+    distinct = list(dict.fromkeys(urls))
+    request_headers = dict(request_headers or {})
+    results = {}
+    stale = {}
+
+    if cache is not None:
+        fresh, stale = cache.lookup(distinct)
+        results.update(fresh)
+        cache.hits += len(fresh)
+        distinct = [url for url in distinct if url not in fresh]
+        for url, cached in stale.items():
+            conditional = {}
+            if cached['etag']:
+                conditional['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                conditional['If-Modified-Since'] = cached['last_modified']
+            if conditional:
+                request_headers[url] = {**request_headers.get(url, {}), **conditional}
+
+    if not distinct:
+        return results
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(DEFAULT_HOST_RATE_LIMITS if rate_limits is None else rate_limits)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=connections_per_host,
+                                     ttl_dns_cache=300, keepalive_timeout=30)
+    # Time out on connecting and reading only: with more tasks than connections
+    # per host, a total timeout would also count the wait for a free connection
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        fetched = await asyncio.gather(*(
+            check_url(session, url, semaphore, limiter, request_headers.get(url))
+            for url in distinct
+        ))
+
+    for result in fetched:
+        url = result['url']
+        if result['status'] == 304 and url in stale:
+            # Unchanged since the last check: keep the cached verdict
+            result = {**stale[url], 'etag': result['etag'] or stale[url]['etag'],
+                      'last_modified': result['last_modified'] or stale[url]['last_modified']}
+            if cache is not None:
+                cache.revalidated += 1
+        elif cache is not None:
+            cache.misses += 1
+        results[url] = result
+
+    if cache is not None:
+        cache.store(results[url] for url in distinct)
+    return results
+
+
+def verify_urls(urls: Iterable[str], **kwargs) -> Dict[str, Dict]:
+    """Synchronous wrapper around verify_urls_async for use from scripts"""
+    return asyncio.run(verify_urls_async(urls, **kwargs))
+
+
+def verify_image_url(url: str) -> bool:
+    """Verify that a single image URL is accessible."""
+    return verify_urls([url])[url]['ok']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that image URLs respond with HTTP 200")
+    parser.add_argument('urls', nargs='*', help="URLs to check")
+    parser.add_argument('--file', help="read URLs from a file, one per line")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.file:
+        with open(args.file) as f:
+            urls.extend(line.strip() for line in f if line.strip())
+
+    cache = cache_from_args(args)
+    results = verify_urls(urls, concurrency=args.concurrency, timeout=args.timeout, cache=cache)
+    if cache is not None:
+        print(f"🗄️  URL cache: {cache.summary()}")
+        cache.close()
+    broken = [r for r in results.values() if not r['ok']]
+    for result in broken:
+        print(f"❌ {result['url']} ({result['status'] or result['error']})")
+    print(f"✅ {len(results) - len(broken)}/{len(results)} URLs OK")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Idempotent provisioning of user documents.
+Existing user docs are read in bulk with get_all, only missing or changed
+users are written (in batches), and the result is verified with the same
+batched reads, so re-running a provisioning script costs a few round-trips
+and writes nothing when everything is already in place.
+Requires: pip install firebase-admin
+"""
+
+from batch_writer import commit_in_batches, print_write_stats
+
+DEFAULT_LOOKUP_BATCH = 300
+
+# Written when a user is created, never overwritten afterwards
+CREATE_ONLY_FIELDS = ('joinedAt',)
+
+
+def fetch_users(db, user_ids, collection='users', lookup_batch=DEFAULT_LOOKUP_BATCH):
+    """Return {user_id: data or None} for `user_ids`, using batched get_all"""
+    users_ref = db.collection(collection)
+    user_ids = list(user_ids)
+    existing = dict.fromkeys(user_ids)
+    for i in range(0, len(user_ids), lookup_batch):
+        refs = [users_ref.document(user_id) for user_id in user_ids[i:i + lookup_batch]]
+        for doc in db.get_all(refs):
+            if doc.exists:
+                existing[doc.id] = doc.to_dict()
+    return existing
+
+
+def _changed_fields(desired, current):
+    return {
+        field: value for field, value in desired.items()
+        if field not in CREATE_ONLY_FIELDS and current.get(field) != value
+    }
+
+
+def plan_user_writes(desired_users, existing_users):
+    """
+    Compare desired user data with what is stored.
+    Returns (creates, updates): {user_id: data} for missing users and
+    {user_id: changed fields} for users whose data differs.
+    """
+    creates, updates = {}, {}
+    for user_id, desired in desired_users.items():
+        current = existing_users.get(user_id)
+        if current is None:
+            creates[user_id] = desired
+        else:
+            changed = _changed_fields(desired, current)
+            if changed:
+                updates[user_id] = changed
+    return creates, updates
+
+
+def verify_users(db, desired_users, collection='users', lookup_batch=DEFAULT_LOOKUP_BATCH):
+    """Return the ids of users that are missing or still differ from `desired_users`"""
+    stored = fetch_users(db, desired_users, collection, lookup_batch)
+    return [
+        user_id for user_id, desired in desired_users.items()
+        if stored[user_id] is None or _changed_fields(desired, stored[user_id])
+    ]
+
+
+def provision_users(db, desired_users, collection='users', lookup_batch=DEFAULT_LOOKUP_BATCH, workers=4):
+    """
+    Make `desired_users` ({user_id: data}) exist with the given data.
+    Returns a stats dict with created/updated/unchanged counts, the write
+    stats and the ids that failed verification.
+    """
+    existing = fetch_users(db, desired_users, collection, lookup_batch)
+    creates, updates = plan_user_writes(desired_users, existing)
+
+    users_ref = db.collection(collection)
+    operations = [('set', users_ref.document(user_id), data) for user_id, data in creates.items()]
+    operations += [('update', users_ref.document(user_id), changed) for user_id, changed in updates.items()]
+
+    write_stats = commit_in_batches(db, operations, max_workers=workers) if operations else None
+    unverified = verify_users(db, desired_users, collection, lookup_batch) if operations else []
+
+    return {
+        'created': sorted(creates),
+        'updated': sorted(updates),
+        'unchanged': len(desired_users) - len(creates) - len(updates),
+        'write_stats': write_stats,
+        'unverified': unverified,
+    }
+
+
+def print_provisioning_stats(stats, names=None):
+    """Summarize a provision_users run; `names` maps user ids to display names"""
+    names = names or {}
+    for user_id in stats['created']:
+        print(f"✅ Created user: {user_id} ({names.get(user_id, '')})")
+    for user_id in stats['updated']:
+        print(f"🔄 Updated user: {user_id} ({names.get(user_id, '')})")
+    print(f"\n🎉 {len(stats['created'])} created, {len(stats['updated'])} updated, "
+          f"{stats['unchanged']} already up to date")
+    if stats['write_stats']:
+        print_write_stats(stats['write_stats'], label="users")
+    if stats['unverified']:
+        print(f"❌ Verification failed for: {stats['unverified']}")
+    else:
+        print("✅ All users verified")
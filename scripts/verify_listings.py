@@ -3,83 +3,69 @@
 Verification script to check the current state of listings in the database.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-from collections import Counter
+import argparse
+from itertools import islice
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK"""
-    try:
-        service_account_path = os.path.join(os.path.dirname(__file__), '..', 'serviceAccountKey.json')
-        
-        if not os.path.exists(service_account_path):
-            print(f"❌ Service account key not found at: {service_account_path}")
-            return None
-            
-        # Check if Firebase is already initialized
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(service_account_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': 'stan-s-list.firebasestorage.app'
-            })
-        
-        return firestore.client()
-    except Exception as e:
-        print(f"❌ Error initializing Firebase: {e}")
-        return None
+from firestore_client import initialize_firebase
+from listing_schema import KEEP_LISTINGS, ListingValidator
+from listing_stats import aggregate_listing_stats, compute_listing_stats, print_listing_stats
+from listings_snapshot import add_snapshot_arguments, snapshot_from_args
+
+SAMPLE_SIZE = 5
 
-def verify_listings():
-    """Check current listings in database"""
-    db = initialize_firebase()
-    if not db:
-        return
+def verify_listings(snapshot=None, workers=8, columnar=None):
+    """
+    Check current listings in database, or in the local snapshot when given.
+    Online, category and status figures come from aggregation queries, and
+    only the preserved listings and a small sample are read as documents.
+    With `columnar`, the path of an export_columnar.py export, the figures
+    are computed from that file with vectorized group-bys instead.
+    """
+    db = None
+    if snapshot is None:
+        db = initialize_firebase()
+        if not db:
+            return
     
     try:
-        print("📊 Fetching all listings...")
+        # Enough leading documents to show the sample and find one fake listing
+        first_count = max(SAMPLE_SIZE, len(KEEP_LISTINGS) + 1)
         
-        listings_ref = db.collection('listings')
-        docs = list(listings_ref.stream())
+        if columnar is not None:
+            # pyarrow is optional, so load it only when reading an export
+            from export_columnar import listing_stats_from_table, load_listings
+            print(f"📊 Reading listing statistics from {columnar}...")
+            stats = listing_stats_from_table(load_listings(columnar, columns=['id', 'category', 'status',
+                                                                              'isActive', 'price']))
         
-        print(f"📊 Total listings: {len(docs)}")
+        if snapshot is not None:
+            if columnar is None:
+                print("📊 Reading listings from the local snapshot...")
+                stats = compute_listing_stats(snapshot.scan('listings'))
+            preserved_docs = [snapshot.document('listings', listing_id) for listing_id in KEEP_LISTINGS]
+            preserved_docs = [doc for doc in preserved_docs if doc is not None]
+            first_docs = list(islice(snapshot.scan('listings'), first_count))
+        else:
+            if columnar is None:
+                print("📊 Aggregating listing statistics...")
+                stats = aggregate_listing_stats(db, max_workers=workers)
+            listings_ref = db.collection('listings')
+            keep_refs = [listings_ref.document(listing_id) for listing_id in KEEP_LISTINGS]
+            preserved_docs = sorted((doc for doc in db.get_all(keep_refs) if doc.exists),
+                                    key=lambda doc: KEEP_LISTINGS.index(doc.id))
+            first_docs = list(listings_ref.limit(first_count).stream())
         
-        # Count by category
-        categories = Counter()
-        preserved_listings = []
+        print_listing_stats(stats)
         
-        # IDs of listings that should be preserved
-        keep_listings = [
-            'eJcyzgfMmfM2eLEmeK62',
-            'qBK9kYmhiYiom99DkluB', 
-            'sNzIfzKXAkpySLNVnUCC',
-            'tdDUoLaNAozUyTriLX3r'
-        ]
-        
-        for doc in docs:
+        print(f"\n🔒 Preserved real listings ({len(preserved_docs)}):")
+        for doc in preserved_docs:
             data = doc.to_dict()
-            category = data.get('category', 'unknown')
-            categories[category] += 1
-            
-            if doc.id in keep_listings:
-                preserved_listings.append({
-                    'id': doc.id,
-                    'title': data.get('title', 'No title'),
-                    'category': category
-                })
-        
-        print("\n📈 Listings by category:")
-        for category, count in categories.items():
-            print(f"  {category}: {count}")
+            print(f"  {doc.id}: {data.get('title', 'No title')} ({data.get('category', 'unknown')})")
         
-        print(f"\n🔒 Preserved real listings ({len(preserved_listings)}):")
-        for listing in preserved_listings:
-            print(f"  {listing['id']}: {listing['title']} ({listing['category']})")
+        sample_docs = first_docs[:SAMPLE_SIZE]
         
         # Sample some new listings
         print(f"\n📝 Sample of recent listings:")
-        sample_docs = docs[:5]  # First 5 listings
         for doc in sample_docs:
             data = doc.to_dict()
             print(f"  {doc.id}: {data.get('title', 'No title')} ({data.get('category', 'unknown')})")
@@ -89,28 +75,19 @@ def verify_listings():
                 has_token = 'token=' in data['images'][0]
                 print(f"    Has token: {has_token}")
         
-        # Check one fake listing data structure in detail
-        fake_listing = None
-        for doc in docs:
-            if doc.id not in keep_listings:
-                fake_listing = doc
-                break
-        
-        if fake_listing:
-            print(f"\n🔍 Detailed fake listing data structure:")
-            fake_data = fake_listing.to_dict()
-            for key, value in fake_data.items():
-                print(f"  {key}: {type(value).__name__} = {value}")
-                # Check for None values that might cause the null error
-                if value is None:
-                    print(f"    ⚠️  NULL VALUE FOUND in {key}")
-                elif isinstance(value, list) and any(item is None for item in value):
-                    print(f"    ⚠️  NULL VALUE IN LIST FOUND in {key}")
-                elif isinstance(value, dict) and any(v is None for v in value.values()):
-                    print(f"    ⚠️  NULL VALUE IN DICT FOUND in {key}")
+        # Check the sampled fake listings against their category schemas
+        # (debug_null_values.py validates the whole collection)
+        print(f"\n🔍 Schema check of the first fake listings:")
+        ListingValidator().validate_documents(first_docs, skip_ids=set(KEEP_LISTINGS)).print_report()
         
     except Exception as e:
         print(f"❌ Error verifying listings: {e}")
 
 if __name__ == "__main__":
-    verify_listings()
+    parser = argparse.ArgumentParser(description="Check the current state of listings in the database")
+    parser.add_argument('--workers', type=int, default=8, help="aggregation queries run concurrently")
+    add_snapshot_arguments(parser)
+    parser.add_argument('--columnar', metavar='PATH',
+                        help="compute statistics from an export_columnar.py export (needs pyarrow)")
+    args = parser.parse_args()
+    verify_listings(snapshot=snapshot_from_args(args), workers=args.workers, columnar=args.columnar)
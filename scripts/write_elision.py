@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Skip Firestore writes that would not change the document.
+Fixers that rewrite listings compare a canonical hash of the fields they are
+about to write with the same fields of the document as scanned, and only send
+the update when they differ, so rerunning an idempotent fixer costs (nearly)
+no writes. The intended fields must have been included in the scan's
+projection; fields missing from the scanned document are always written.
+Writes that are sent also bump updatedAt; it is not part of the comparison.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from firestore_client import stamp_updated
+
+_MISSING = object()
+
+
+def _canonical(value):
+    """JSON-compatible form in which equal Firestore values compare equal"""
+    if isinstance(value, (list, tuple)):
+        # ListingRecord keeps arrays as tuples
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    # GeoPoints, references and other rare types
+    return {'__repr__': repr(value)}
+
+
+def content_hash(fields):
+    """Stable digest of a {field: value} mapping, independent of key order"""
+    encoded = json.dumps(_canonical(fields), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ElidingWriter:
+    """
+    Update documents of `collection_ref` only when the intended top-level
+    fields differ from the scanned document's (a DocumentSnapshot or
+    ListingRecord). Counts the writes sent and the writes elided.
+    """
+
+    def __init__(self, collection_ref):
+        self.collection_ref = collection_ref
+        self.written = 0
+        self.elided = 0
+
+    def is_unchanged(self, doc, fields):
+        data = doc.to_dict() or {}
+        current = {}
+        for field in fields:
+            value = data.get(field, _MISSING)
+            if value is _MISSING:
+                return False
+            current[field] = value
+        return content_hash(current) == content_hash(fields)
+
+    def update(self, doc, fields):
+        """Write `fields` to `doc` unless they already hold those values; returns True if written"""
+        if self.is_unchanged(doc, fields):
+            self.elided += 1
+            return False
+        self.collection_ref.document(doc.id).update(stamp_updated(fields))
+        self.written += 1
+        return True
+
+    def summary(self):
+        return f"✍️  {self.written} writes sent, {self.elided} unchanged listings skipped"